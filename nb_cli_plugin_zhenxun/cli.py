@@ -1,3 +1,5 @@
+import importlib
+import sys
 from typing import cast
 
 import click
@@ -5,12 +7,86 @@ from nb_cli import _
 from nb_cli.cli import CLI_DEFAULT_STYLE, ClickAliasedGroup, run_async, run_sync
 from noneprompt import CancelledError, Choice, ListPrompt
 
-from . import __version__
+from . import __version__, commands
+from .commands import COMMANDS, CommandInfo
 from .meta import LOGO
 
 
+class LazyAliasedGroup(ClickAliasedGroup):
+    """按需导入子命令的命令组，列出命令与帮助时只读取元信息"""
+
+    def __init__(self, *args, lazy_commands: dict[str, CommandInfo], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands
+        for name, info in lazy_commands.items():
+            if info.aliases:
+                self.add_aliases(name, list(info.aliases))
+
+    def _load(self, cmd_name: str):
+        module_name, _, attr = self.lazy_commands[cmd_name].import_path.partition(":")
+        module = importlib.import_module(module_name, commands.__name__)
+        self.add_command(getattr(module, attr), cmd_name)
+
+    def get_command(self, ctx: click.Context, cmd_name: str):
+        cmd_name = self.resolve_alias(cmd_name)
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            self._load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [
+            *self.lazy_commands,
+            *(n for n in self.commands if n not in self.lazy_commands),
+        ]
+
+    def get_help_info(self, ctx: click.Context, cmd_name: str) -> tuple[str, bool]:
+        """不导入命令模块获取帮助信息
+
+        参数:
+            ctx: ctx
+            cmd_name: 命令名
+
+        返回:
+            tuple[str, bool]: 帮助信息，是否隐藏
+        """
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            info = self.lazy_commands[cmd_name]
+            return info.help, info.hidden
+        cmd = self.get_command(ctx, cmd_name)
+        if cmd is None:
+            return "", True
+        return cmd.help or "", cmd.hidden
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter):
+        sub_commands = self.list_commands(ctx)
+        if not sub_commands:
+            return
+        limit = formatter.width - 6 - max(len(cmd) for cmd in sub_commands)
+        rows = []
+        for sub_command in sub_commands:
+            cmd_help, hidden = self.get_help_info(ctx, sub_command)
+            if hidden:
+                continue
+            if sub_command in self._commands:
+                aliases = ",".join(sorted(self._commands[sub_command]))
+                sub_command = f"{sub_command} ({aliases})"
+            rows.append(
+                (sub_command, click.utils.make_default_short_help(cmd_help, limit))
+            )
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+
+def _shutdown_http():
+    # 未发起过网络请求时无需导入 http_utils
+    if http_utils := sys.modules.get(f"{__package__}.utils.http_utils"):
+        http_utils.AsyncHttpx.shutdown()
+
+
 @click.group(
-    cls=ClickAliasedGroup,
+    cls=LazyAliasedGroup,
+    lazy_commands=COMMANDS,
     invoke_without_command=True,
     help="管理小真寻.",
 )
@@ -25,22 +101,27 @@ from .meta import LOGO
 @run_async
 async def zhenxun(ctx: click.Context):
     """为 zhenxun 定制的Nonebot CLI 插件."""
+    ctx.call_on_close(_shutdown_http)
     if ctx.invoked_subcommand is not None:
         return
 
-    command = cast(ClickAliasedGroup, ctx.command)
+    command = cast(LazyAliasedGroup, ctx.command)
 
-    # auto discover sub commands and scripts
-    choices: list[Choice[click.Command]] = []
+    # 只读取命令元信息，选择后再导入对应命令
+    choices: list[Choice[str]] = []
     for sub_cmd_name in await run_sync(command.list_commands)(ctx):
-        if sub_cmd := await run_sync(command.get_command)(ctx, sub_cmd_name):
-            choices.append(
-                Choice(
-                    sub_cmd.help
-                    or _("Run subcommand {sub_cmd.name!r}").format(sub_cmd=sub_cmd),
-                    sub_cmd,
+        cmd_help, hidden = command.get_help_info(ctx, sub_cmd_name)
+        if hidden:
+            continue
+        choices.append(
+            Choice(
+                cmd_help
+                or _("Run subcommand {sub_cmd.name!r}").format(
+                    sub_cmd=command.get_command(ctx, sub_cmd_name)
                 ),
-            )
+                sub_cmd_name,
+            ),
+        )
     click.secho(LOGO, fg="green", bold=True)
     click.secho("欢迎来到小真寻的Nonebot CLI 插件!", fg="green", bold=True)
 
@@ -52,16 +133,10 @@ async def zhenxun(ctx: click.Context):
     except CancelledError:
         ctx.exit()
 
-    sub_cmd = result.data
+    sub_cmd = await run_sync(command.get_command)(ctx, result.data)
     await run_sync(ctx.invoke)(sub_cmd)
 
 
-from .commands import create, run
-
-zhenxun.add_command(create)
-zhenxun.add_command(run)
-
-
 @zhenxun.command(
     aliases=["show"],
     help="展示小真寻的LOGO.",
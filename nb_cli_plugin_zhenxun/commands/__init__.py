@@ -1,2 +1,29 @@
-from .create import create as create
-from .run import run as run
+from typing import NamedTuple
+
+
+class CommandInfo(NamedTuple):
+    """子命令元信息，用于在不导入命令模块的情况下列出命令"""
+
+    import_path: str
+    """命令对象的位置，格式为 模块:属性，模块相对于 commands 包"""
+    help: str
+    """帮助信息，需与命令定义一致"""
+    aliases: tuple[str, ...] = ()
+    """命令别名，需与命令定义一致"""
+    hidden: bool = False
+    """是否在帮助与菜单中隐藏"""
+
+
+COMMANDS: dict[str, CommandInfo] = {
+    "create": CommandInfo(".create:create", "在当前目录下安装小真寻.", ("new", "init")),
+    "run": CommandInfo(".run:run", "启动小真寻.", ("start",)),
+    "update": CommandInfo(".update:update", "增量更新小真寻.", ("upgrade",)),
+    "warmup": CommandInfo(
+        ".warmup:warmup", "预编译字节码，减少首次启动耗时.", ("compile",)
+    ),
+    "wheelhouse": CommandInfo(".wheelhouse:wheelhouse", "管理本地wheel缓存."),
+    "import-time": CommandInfo(
+        ".import_time:import_time", "测量插件对 nb 命令启动耗时的影响.", hidden=True
+    ),
+}
+"""小真寻子命令，仅在调用时导入对应模块"""
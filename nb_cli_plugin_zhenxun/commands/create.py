@@ -9,6 +9,7 @@ from noneprompt import (
     ListPrompt,
 )
 
+from ..handlers.batch import DEFAULT_INDEX_URL, CreateSpec, create_from_spec
 from ..handlers.create import (
     GitInstallHelp,
     check_path,
@@ -16,8 +17,11 @@ from ..handlers.create import (
     install_dependencies,
     run_download_install,
     run_git_install,
+    run_stream_install,
     setting_env,
+    warmup_project,
 )
+from ..utils.source_cache import LinkMode
 
 
 @click.command(
@@ -36,17 +40,159 @@ from ..handlers.create import (
     "-i",
     "--index-url",
     "index_url",
-    default="https://mirrors.aliyun.com/pypi/simple/",
+    default=DEFAULT_INDEX_URL,
     help="pip下载所使用的镜像源",
 )
+@click.option(
+    "--installer",
+    type=click.Choice(["auto", "uv", "poetry", "pip"]),
+    default="auto",
+    help="依赖安装方式，auto 时优先使用 uv",
+)
+@click.option(
+    "--wheelhouse/--no-wheelhouse",
+    default=False,
+    help="使用本地wheel缓存，首次安装时填充，之后离线安装(仅 uv/pip)",
+)
+@click.option(
+    "--partial-clone",
+    is_flag=True,
+    default=False,
+    help="git安装时部分克隆，文件内容在检出时按需下载",
+)
+@click.option(
+    "--sparse",
+    multiple=True,
+    help="git安装时只检出指定目录(可多次使用)，根目录下的文件总会检出",
+)
+@click.option(
+    "--git-reference",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="git安装时与该本地仓库共享对象，多个实例共用一份对象(请勿删除该仓库)",
+)
+@click.option(
+    "--link-mode",
+    type=click.Choice(["auto", "hardlink", "copy"]),
+    default="auto",
+    help="从源码缓存复制到项目的方式，auto 在支持时使用写时复制(reflink)",
+)
+@click.option(
+    "--warmup/--no-warmup",
+    default=False,
+    help="安装依赖后预编译字节码，减少首次启动耗时",
+)
+@click.option(
+    "-c",
+    "--config",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="从toml配置文件无交互地创建一个或多个项目",
+)
+@click.option(
+    "-y",
+    "--yes",
+    "non_interactive",
+    is_flag=True,
+    default=False,
+    help="无交互创建，未指定的选项使用默认值",
+)
+@click.option(
+    "-n",
+    "--name",
+    "names",
+    multiple=True,
+    help="[无交互] 项目名称(可多次使用以创建多个项目)",
+)
+@click.option(
+    "--install-method",
+    type=click.Choice(["git", "download", "stream"]),
+    default="stream",
+    help="[无交互] 安装方式",
+)
+@click.option(
+    "--on-conflict",
+    type=click.Choice(["exit", "delete", "use"]),
+    default="exit",
+    help="[无交互] 项目文件夹已存在时的操作",
+)
+@click.option(
+    "--superuser",
+    "superusers",
+    multiple=True,
+    help="[无交互] 超级用户QQ(可多次使用)",
+)
+@click.option("--db-url", default="", help="[无交互] 数据库连接地址，为空则使用sqlite")
+@click.option(
+    "--install-deps/--no-install-deps",
+    default=True,
+    help="[无交互] 是否安装依赖",
+)
+@click.option(
+    "--git-mirror",
+    default="auto",
+    help="[无交互] git克隆源地址，auto 时自动选择",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=4,
+    type=click.IntRange(min=1),
+    help="[无交互] 同时安装依赖的项目数",
+)
 @click.pass_context
 @run_async
 async def create(
     ctx: click.Context,
     python_interpreter: str | None,
     index_url: str,
+    installer: str,
+    wheelhouse: bool,
+    partial_clone: bool,
+    sparse: tuple[str, ...],
+    git_reference: Path | None,
+    link_mode: LinkMode,
+    warmup: bool,
+    config: Path | None,
+    non_interactive: bool,
+    names: tuple[str, ...],
+    install_method: str,
+    on_conflict: str,
+    superusers: tuple[str, ...],
+    db_url: str,
+    install_deps: bool,
+    git_mirror: str,
+    jobs: int,
 ):
     """在当前目录下安装小真寻."""
+    if config or non_interactive or names:
+        try:
+            if config:
+                # 命令行中显式指定的选项覆盖配置文件，项目名称、超级用户与
+                # 数据库地址合并到配置文件的项目中
+                spec = CreateSpec.load(
+                    config,
+                    **{
+                        key: value
+                        for key, value in ctx.params.items()
+                        if ctx.get_parameter_source(key)
+                        == click.core.ParameterSource.COMMANDLINE
+                    },
+                )
+            else:
+                spec = CreateSpec(
+                    **ctx.params,
+                    projects=[
+                        {"name": name, "superusers": superusers, "db_url": db_url}
+                        for name in names or ["zhenxun_bot"]
+                    ],
+                )
+        except Exception as e:
+            click.secho(f"读取创建配置失败: {e}", fg="red")
+            ctx.exit(1)
+        if not await create_from_spec(ctx, spec):
+            ctx.exit(1)
+        return
     try:
         click.clear()
         click.secho("正在检测python版本...", fg="yellow")
@@ -60,6 +206,7 @@ async def create(
             [
                 Choice("git安装", "git"),
                 Choice("下载安装", "download"),
+                Choice("下载安装(边下载边解压)", "stream"),
             ],
             default_select=0,
         ).prompt_async(style=CLI_DEFAULT_STYLE)
@@ -73,9 +220,19 @@ async def create(
         if not project_name.endswith("[use]"):
             click.secho(f"开始安装({install_choice.name})小真寻...", fg="yellow")
             if install_choice.data == "download":
-                await run_download_install(ctx, project_name)
+                if not await run_download_install(ctx, project_name, link_mode):
+                    ctx.exit(1)
+            elif install_choice.data == "stream":
+                if not await run_stream_install(ctx, project_name, link_mode):
+                    ctx.exit(1)
             else:
-                await run_git_install(ctx, project_name)
+                await run_git_install(
+                    ctx,
+                    project_name,
+                    partial=partial_clone,
+                    sparse=list(sparse),
+                    reference=git_reference,
+                )
         project_name = project_name.replace("[use]", "")
         await setting_env(ctx, project_name)
         is_install_dependencies = await ConfirmPrompt(
@@ -83,11 +240,19 @@ async def create(
             default_choice=True,
         ).prompt_async(style=CLI_DEFAULT_STYLE)
         if is_install_dependencies:
-            proc = await install_dependencies(
-                project_name, python_interpreter, ["-i", index_url]
+            is_install_dependencies = await install_dependencies(
+                project_name,
+                python_interpreter,
+                ["-i", index_url],
+                installer,
+                wheelhouse,
             )
-            await proc.wait()
-            click.secho("安装小真寻依赖完成！", fg="yellow")
+            if is_install_dependencies:
+                click.secho("安装小真寻依赖完成！", fg="yellow")
+                if warmup:
+                    await warmup_project(project_name, python_interpreter)
+            else:
+                click.secho("安装小真寻依赖失败，请检查上方输出...", fg="red")
         if not (Path() / project_name).is_dir():
             ctx.exit()
 
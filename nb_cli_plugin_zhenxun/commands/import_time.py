@@ -0,0 +1,45 @@
+import click
+from nb_cli.cli import ClickAliasedCommand, run_async
+
+from ..handlers.import_time import check_command_info, measure_import_time
+
+
+@click.command(
+    "import-time",
+    cls=ClickAliasedCommand,
+    hidden=True,
+    help="测量插件对 nb 命令启动耗时的影响.",
+)
+@click.option("-n", "--rounds", default=5, show_default=True, help="测量次数")
+@click.option(
+    "--max-ms",
+    type=float,
+    default=None,
+    help="耗时中位数超过该值(毫秒)时返回失败，用于回归检查",
+)
+@click.pass_context
+@run_async
+async def import_time(ctx: click.Context, rounds: int, max_ms: float | None):
+    click.secho(f"测量插件加载耗时({rounds} 次)...", fg="yellow")
+    result = await measure_import_time(rounds)
+    click.secho(
+        f"加载耗时: 中位数 {result.median:.1f}ms, 最短 {result.best:.1f}ms, "
+        f"导入插件模块 {len(result.modules)} 个",
+        fg="green",
+    )
+    failed = False
+    if eager := result.eager_modules:
+        click.secho(f"以下模块在加载插件时被提前导入: {', '.join(eager)}", fg="red")
+        failed = True
+    if mismatched := check_command_info():
+        click.secho(
+            f"以下命令的元信息与定义不一致: {', '.join(mismatched)}，"
+            "请同步 commands.COMMANDS",
+            fg="red",
+        )
+        failed = True
+    if max_ms is not None and result.median > max_ms:
+        click.secho(f"加载耗时超过 {max_ms:.1f}ms", fg="red")
+        failed = True
+    if failed:
+        ctx.exit(1)
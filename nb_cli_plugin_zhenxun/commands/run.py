@@ -1,4 +1,5 @@
 import asyncio
+from itertools import zip_longest
 from pathlib import Path
 
 import click
@@ -10,6 +11,17 @@ from nb_cli.handlers import (
     terminate_process,
 )
 
+from ..handlers.fleet import (
+    FleetSpec,
+    is_zhenxun_project,
+    parse_cpus,
+    run_fleet,
+    set_affinity,
+    start_bot,
+)
+from ..handlers.installer import find_project_python
+from ..handlers.supervisor import READY_PATTERN
+
 
 @click.command(
     cls=ClickAliasedCommand,
@@ -17,23 +29,174 @@ from nb_cli.handlers import (
     context_settings={"ignore_unknown_options": True},
     help="启动小真寻.",
 )
-@click.option("-d", "--cwd", default=".", help="指定工作目录.")
+@click.option(
+    "-d",
+    "--cwd",
+    multiple=True,
+    default=["."],
+    help="指定工作目录，可多次指定以同时运行多个实例.",
+)
+@click.option(
+    "-f",
+    "--fleet",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="多实例运行配置文件(toml)，命令行中指定的选项会覆盖配置文件",
+)
+@click.option(
+    "--cpus",
+    multiple=True,
+    help="绑定的CPU核心，如 0-3,6，按顺序与 --cwd 对应",
+)
+@click.option(
+    "--stagger",
+    default=5.0,
+    show_default=True,
+    help="多实例时前一个实例就绪或等待该秒数后再启动下一个",
+)
 @click.option(
     "-p",
     "--python-interpreter",
     default=None,
     help="指定Python解释器的路径",
 )
+@click.option(
+    "--use-poetry",
+    is_flag=True,
+    default=False,
+    help="通过 poetry run 启动，而不是直接使用虚拟环境解释器",
+)
+@click.option(
+    "--refresh-python",
+    is_flag=True,
+    default=False,
+    help="重新查询虚拟环境解释器路径",
+)
+@click.option(
+    "--supervise",
+    "supervise_",
+    is_flag=True,
+    default=False,
+    help="守护运行，异常退出时自动重启",
+)
+@click.option(
+    "--max-restarts",
+    default=5,
+    show_default=True,
+    help="守护模式下 --restart-window 秒内最多重启次数",
+)
+@click.option(
+    "--restart-window",
+    default=300.0,
+    show_default=True,
+    help="守护模式下统计重启次数的时间窗口(秒)",
+)
+@click.option(
+    "--backoff-max",
+    default=60.0,
+    show_default=True,
+    help="守护模式下重启前最长等待秒数",
+)
+@click.option(
+    "--ready-pattern",
+    default=READY_PATTERN,
+    show_default=True,
+    help="守护模式下判断启动完成的日志正则，为空时不检测",
+)
+@click.option(
+    "--ready-file",
+    default=None,
+    type=click.Path(path_type=Path),
+    help="守护模式下判断启动完成的文件，小真寻就绪后创建",
+)
+@click.option(
+    "--fork-server",
+    is_flag=True,
+    default=False,
+    help="常驻预加载依赖的解释器，重启时 fork 新进程以跳过导入(隐含 --supervise)",
+)
+@click.option(
+    "--preload",
+    multiple=True,
+    help="fork-server 预加载的模块，可多次指定，默认为常用依赖",
+)
 @click.pass_context
 @run_async
-async def run(ctx: click.Context, cwd: str, python_interpreter: str | None):
-    project_path = Path(cwd)
-    if not (
-        (project_path / "zhenxun").is_dir() and (project_path / "bot.py").is_file()
+async def run(
+    ctx: click.Context,
+    cwd: tuple[str, ...],
+    fleet: Path | None,
+    cpus: tuple[str, ...],
+    stagger: float,
+    python_interpreter: str | None,
+    use_poetry: bool,
+    refresh_python: bool,
+    supervise_: bool,
+    max_restarts: int,
+    restart_window: float,
+    backoff_max: float,
+    ready_pattern: str,
+    ready_file: Path | None,
+    fork_server: bool,
+    preload: tuple[str, ...],
+):
+    if fleet is not None and (
+        conflicts := [
+            f"--{key}"
+            for key in ("cwd", "cpus", "preload")
+            if ctx.get_parameter_source(key) == click.core.ParameterSource.COMMANDLINE
+        ]
     ):
+        # 实例相关选项需在配置文件的 instances 中分别指定
+        click.secho(
+            f"--fleet 不能与 {'/'.join(conflicts)} 同时使用，"
+            "请在配置文件的 instances 中指定",
+            fg="red",
+        )
+        ctx.exit(1)
+
+    try:
+        if fleet is not None:
+            # 命令行中显式指定的选项覆盖配置文件
+            spec = FleetSpec.load(
+                fleet,
+                **{
+                    key: value
+                    for key, value in ctx.params.items()
+                    if key in FleetSpec.__fields__
+                    and ctx.get_parameter_source(key)
+                    == click.core.ParameterSource.COMMANDLINE
+                },
+            )
+        else:
+            spec = FleetSpec(
+                **ctx.params,
+                instances=[
+                    {"cwd": path, "cpus": parse_cpus(cpu), "preload": preload}
+                    for path, cpu in zip_longest(cwd, cpus[: len(cwd)], fillvalue="")
+                ],
+            )
+    except Exception as e:
+        click.secho(f"读取运行配置失败: {e}", fg="red")
+        ctx.exit(1)
+
+    if fleet is not None or len(spec.instances) > 1 or supervise_ or spec.fork_server:
+        ctx.exit(await run_fleet(spec))
+
+    instance = spec.instances[0]
+    project_path = instance.cwd
+    if not is_zhenxun_project(project_path):
         click.secho("未检测到该目录下有小真寻，请确保目录无误", fg="red")
         ctx.exit()
 
+    python_path = spec.python_interpreter or await get_default_python()
+
+    python = None
+    if not spec.use_poetry:
+        python = await find_project_python(
+            project_path, python_path, refresh=spec.refresh_python
+        )
+
     should_exit = asyncio.Event()
 
     def shutdown(signum, frame):
@@ -45,14 +208,8 @@ async def run(ctx: click.Context, cwd: str, python_interpreter: str | None):
         await should_exit.wait()
         await terminate_process(proc)
 
-    python_path = python_interpreter or await get_default_python()
-
-    proc = await asyncio.create_subprocess_exec(
-        python_path,
-        "-m",
-        *["poetry", "run", "python", "bot.py"],
-        cwd=cwd,
-    )
+    proc = await start_bot(project_path, python, python_path)
+    set_affinity(proc.pid, instance.cpus)
     task = asyncio.create_task(wait_for_exit())
     await proc.wait()
     should_exit.set()
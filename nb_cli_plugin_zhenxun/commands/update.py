@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import click
+from nb_cli.cli import ClickAliasedCommand, run_async
+
+from ..utils.update_help import UpdateHelp
+
+
+@click.command(
+    cls=ClickAliasedCommand,
+    aliases=["upgrade"],
+    context_settings={"ignore_unknown_options": True},
+    help="增量更新小真寻.",
+)
+@click.option("-d", "--cwd", default=".", help="指定工作目录.")
+@click.option(
+    "-c",
+    "--concurrency",
+    default=8,
+    type=click.IntRange(min=1),
+    help="同时下载的文件数",
+)
+@click.option(
+    "-f",
+    "--force",
+    is_flag=True,
+    default=False,
+    help="重新比对全部文件并覆盖本地修改",
+)
+@click.option(
+    "-r",
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="忽略本地缓存，重新获取远程文件列表",
+)
+@click.pass_context
+@run_async
+async def update(
+    ctx: click.Context, cwd: str, concurrency: int, force: bool, refresh: bool
+):
+    """增量更新小真寻."""
+    project_path = Path(cwd)
+    if not (
+        (project_path / "zhenxun").is_dir() and (project_path / "bot.py").is_file()
+    ):
+        click.secho("未检测到该目录下有小真寻，请确保目录无误", fg="red")
+        ctx.exit()
+    if (project_path / ".git").exists() and not force:
+        click.secho("该目录为git仓库，请使用 git pull 更新小真寻", fg="yellow")
+        ctx.exit()
+    await UpdateHelp.update(
+        ctx, project_path, concurrency=concurrency, force=force, refresh=refresh
+    )
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import click
+from nb_cli.cli import ClickAliasedCommand, run_async
+from nb_cli.handlers import get_default_python
+
+from ..handlers.installer import project_python
+from ..handlers.warmup import warmup as warmup_project
+
+
+@click.command(
+    cls=ClickAliasedCommand,
+    aliases=["compile"],
+    context_settings={"ignore_unknown_options": True},
+    help="预编译字节码，减少首次启动耗时.",
+)
+@click.option("-d", "--cwd", default=".", help="指定工作目录.")
+@click.option(
+    "-p",
+    "--python-interpreter",
+    default=None,
+    help="指定Python解释器的路径",
+)
+@click.option(
+    "--probe/--no-probe",
+    default=False,
+    help="加载全部插件(不启动)并报告导入最慢的模块",
+)
+@click.option(
+    "-t",
+    "--top",
+    default=10,
+    type=click.IntRange(min=1),
+    help="报告导入最慢的模块个数",
+)
+@click.pass_context
+@run_async
+async def warmup(
+    ctx: click.Context,
+    cwd: str,
+    python_interpreter: str | None,
+    probe: bool,
+    top: int,
+):
+    """预编译字节码，减少首次启动耗时."""
+    project_path = Path(cwd)
+    if not (
+        (project_path / "zhenxun").is_dir() and (project_path / "bot.py").is_file()
+    ):
+        click.secho("未检测到该目录下有小真寻，请确保目录无误", fg="red")
+        ctx.exit()
+    python = await project_python(
+        project_path, python_interpreter or await get_default_python()
+    )
+    if not await warmup_project(project_path, python, probe=probe, top=top):
+        ctx.exit(1)
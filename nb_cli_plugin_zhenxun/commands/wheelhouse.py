@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import click
+from nb_cli.cli import ClickAliasedGroup, run_async
+from nb_cli.handlers import get_default_python
+
+from ..handlers.installer import InstallStep, run_install_plan, write_requirement_files
+from ..handlers.wheelhouse import Wheelhouse
+
+
+@click.group(cls=ClickAliasedGroup, help="管理本地wheel缓存.")
+def wheelhouse():
+    """管理本地wheel缓存."""
+
+
+@wheelhouse.command(help="为项目填充本地wheel缓存.")
+@click.option("-d", "--cwd", default=".", help="指定工作目录.")
+@click.option(
+    "-p",
+    "--python-interpreter",
+    default=None,
+    help="指定Python解释器的路径",
+)
+@click.option(
+    "-i",
+    "--index-url",
+    "index_url",
+    default="https://mirrors.aliyun.com/pypi/simple/",
+    help="pip下载所使用的镜像源",
+)
+@click.pass_context
+@run_async
+async def build(
+    ctx: click.Context, cwd: str, python_interpreter: str | None, index_url: str
+):
+    """为项目填充本地wheel缓存."""
+    project_path = Path(cwd)
+    if not (project_path / "pyproject.toml").is_file():
+        click.secho("未检测到该目录下有pyproject.toml，请确保目录无误", fg="red")
+        ctx.exit()
+    python_path = python_interpreter or await get_default_python()
+    key = await Wheelhouse.key(project_path, python_path)
+    if Wheelhouse.has(key):
+        Wheelhouse.touch(key)
+        click.secho("本地wheel缓存已存在！", fg="green")
+        return
+    build_dir = Wheelhouse.build_dir(key)
+    step = InstallStep(
+        "下载依赖到本地wheel缓存",
+        Wheelhouse.build_args(
+            [await Wheelhouse.base_python(python_path), "-m", "pip"],
+            build_dir,
+            write_requirement_files(project_path),
+            ["-i", index_url],
+        ),
+        on_success=lambda: Wheelhouse.commit(key, build_dir),
+        on_failure=lambda: Wheelhouse.discard(build_dir),
+    )
+    if not await run_install_plan([step], project_path):
+        ctx.exit(1)
+
+
+@wheelhouse.command(help="按最近使用时间清理本地wheel缓存.")
+@click.option(
+    "-m",
+    "--max-size",
+    default=2048,
+    type=click.IntRange(min=0),
+    help="缓存大小上限(MB)",
+)
+def prune(max_size: int):
+    """按最近使用时间清理本地wheel缓存."""
+    removed, freed = Wheelhouse.prune(max_size * 1024 * 1024)
+    click.secho(
+        f"已删除 {removed} 个wheel，释放 {freed / 1024 / 1024:.1f}MB", fg="green"
+    )
@@ -1,3 +1,15 @@
+from .download import (
+    DownloadTask as DownloadTask,
+)
+from .download import (
+    async_download_files as async_download_files,
+)
+from .download import (
+    async_download_json as async_download_json,
+)
+from .download import (
+    async_download_with_bar as async_download_with_bar,
+)
 from .download import (
     download_json as download_json,
 )
@@ -0,0 +1,213 @@
+import asyncio
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Literal
+
+import click
+from nb_cli.cli.commands.project import project_name_validator
+from pydantic import BaseModel
+
+from ..utils.git_help import GitInstallHelp
+from ..utils.source_cache import LinkMode, link_tree
+from .create import (
+    check_python_version,
+    install_dependencies,
+    remove_project,
+    run_download_install,
+    run_git_install,
+    run_stream_install,
+    warmup_project,
+    write_env,
+)
+from .installer import load_toml
+
+DEFAULT_INDEX_URL = "https://mirrors.aliyun.com/pypi/simple/"
+"""默认的pip镜像源"""
+
+
+class ProjectSpec(BaseModel):
+    """单个项目配置"""
+
+    name: str
+    """项目名称"""
+    superusers: list[int | str] = []
+    """超级用户QQ"""
+    db_url: str = ""
+    """数据库连接地址，为空则使用sqlite"""
+
+
+class CreateSpec(BaseModel):
+    """批量创建配置，对应 create 命令中的各个询问"""
+
+    install_method: Literal["git", "download", "stream"] = "stream"
+    """安装方式"""
+    on_conflict: Literal["exit", "delete", "use"] = "exit"
+    """项目文件夹已存在时的操作"""
+    install_deps: bool = True
+    """是否安装依赖"""
+    python_interpreter: str | None = None
+    """Python解释器路径"""
+    index_url: str = DEFAULT_INDEX_URL
+    """pip镜像源"""
+    installer: Literal["auto", "uv", "poetry", "pip"] = "auto"
+    """依赖安装方式"""
+    wheelhouse: bool = False
+    """使用本地wheel缓存"""
+    git_mirror: str = "auto"
+    """git克隆源，auto 时自动选择"""
+    partial_clone: bool = False
+    """git部分克隆"""
+    sparse: list[str] = []
+    """git只检出的目录"""
+    git_reference: Path | None = None
+    """git共享对象的本地仓库"""
+    link_mode: LinkMode = "auto"
+    """源码复制方式"""
+    warmup: bool = False
+    """安装依赖后预编译字节码"""
+    jobs: int = 4
+    """同时安装依赖的项目数"""
+    projects: list[ProjectSpec]
+    """要创建的项目"""
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        *,
+        names: Sequence[str] | None = None,
+        superusers: Sequence[int | str] | None = None,
+        db_url: str | None = None,
+        **overrides,
+    ) -> "CreateSpec":
+        """读取 toml 配置文件
+
+        参数:
+            path: 配置文件路径
+            names: 只创建这些项目，配置文件中同名项目的设置会保留
+            superusers: 覆盖所有项目的超级用户
+            db_url: 覆盖所有项目的数据库连接地址
+            overrides: 覆盖配置文件的选项
+        """
+        data = {**load_toml(path.read_text(encoding="utf-8")), **overrides}
+        if names:
+            projects = {
+                project.get("name"): project for project in data.get("projects", [])
+            }
+            data["projects"] = [projects.get(name, {"name": name}) for name in names]
+        for project in data.get("projects", []):
+            if superusers is not None:
+                project["superusers"] = list(superusers)
+            if db_url is not None:
+                project["db_url"] = db_url
+        return cls(**data)
+
+
+async def _fetch_source(
+    ctx: click.Context, project_name: str, spec: CreateSpec, single: bool
+) -> bool:
+    if spec.install_method == "download":
+        return await run_download_install(ctx, project_name, spec.link_mode, single)
+    if spec.install_method == "stream":
+        return await run_stream_install(ctx, project_name, spec.link_mode, single)
+    await run_git_install(
+        ctx,
+        project_name,
+        partial=spec.partial_clone,
+        sparse=spec.sparse,
+        reference=spec.git_reference,
+        mirror=spec.git_mirror,
+    )
+    return True
+
+
+async def create_from_spec(ctx: click.Context, spec: CreateSpec) -> bool:
+    """按配置无交互地创建一个或多个项目
+
+    源码只下载(克隆)一次，其余项目从第一个项目复制(支持时使用 reflink/硬链接)；
+    依赖先为第一个项目安装，填充wheel缓存后其余项目并行安装
+
+    参数:
+        ctx: ctx
+        spec: 创建配置
+
+    返回:
+        bool: 是否全部成功
+    """
+    if not check_python_version():
+        click.secho("当前python版本过低，python版本至少需要3.10及以上！", fg="red")
+        return False
+    names = [project.name for project in spec.projects]
+    if invalid := [name for name in names if not project_name_validator(name)]:
+        click.secho(f"项目名称不合法: {', '.join(invalid)}", fg="red")
+        return False
+    if len(set(names)) != len(names):
+        click.secho("项目名称不能重复", fg="red")
+        return False
+    if spec.install_method == "git" and not await GitInstallHelp.check_git():
+        click.secho("未检测到git，请先安装git...", fg="red")
+        return False
+
+    to_install: list[str] = []
+    for name in names:
+        project_path = Path() / name
+        if not project_path.is_dir():
+            to_install.append(name)
+        elif spec.on_conflict == "delete":
+            remove_project(project_path)
+            to_install.append(name)
+        elif spec.on_conflict == "exit":
+            click.secho(f"当前目录下已存在项目文件夹 {name}", fg="red")
+            return False
+
+    if to_install:
+        source = to_install[0]
+        click.secho(f"开始安装({spec.install_method})小真寻...", fg="yellow")
+        if (
+            not await _fetch_source(ctx, source, spec, len(to_install) == 1)
+            or not (Path() / source).is_dir()
+        ):
+            click.secho("获取小真寻源码失败", fg="red")
+            return False
+        for name in to_install[1:]:
+            click.secho(f"复制源码到 {name}...", fg="yellow")
+            await asyncio.to_thread(
+                link_tree, Path() / source, Path() / name, spec.link_mode
+            )
+
+    results: dict[str, bool] = {}
+    for project in spec.projects:
+        results[project.name] = write_env(
+            project.name, [str(user) for user in project.superusers], project.db_url
+        )
+        if not results[project.name]:
+            click.secho(f"{project.name} 缺少配置文件 .env.dev", fg="red")
+
+    if spec.install_deps:
+        pending = [name for name in names if results[name]]
+        semaphore = asyncio.Semaphore(spec.jobs)
+
+        async def install(name: str):
+            async with semaphore:
+                click.secho(f"开始为 {name} 安装依赖...", fg="yellow")
+                results[name] = await install_dependencies(
+                    name,
+                    spec.python_interpreter,
+                    ["-i", spec.index_url],
+                    spec.installer,
+                    spec.wheelhouse,
+                )
+            if results[name] and spec.warmup:
+                await warmup_project(name, spec.python_interpreter)
+
+        if pending:
+            # 第一个项目填充wheel缓存，其余项目离线安装
+            await install(pending[0])
+            await asyncio.gather(*(install(name) for name in pending[1:]))
+
+    for name, ok in results.items():
+        if ok:
+            click.secho(f"{name} 创建完成！", fg="green")
+        else:
+            click.secho(f"{name} 创建失败！", fg="red")
+    return all(results.values())
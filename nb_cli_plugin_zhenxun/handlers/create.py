@@ -1,8 +1,5 @@
 import asyncio
-import os
 from pathlib import Path
-import shutil
-import stat
 import sys
 
 import click
@@ -13,6 +10,9 @@ from noneprompt import Choice, InputPrompt, ListPrompt
 
 from ..utils.download_help import DownloadInstallHelp
 from ..utils.git_help import GitInstallHelp
+from ..utils.source_cache import LinkMode, remove_project
+from .installer import get_installer, project_python, run_install_plan
+from .warmup import warmup
 
 
 def check_python_version():
@@ -54,12 +54,7 @@ async def check_path(ctx: click.Context) -> str:
             elif dir_choice.data == "use":
                 return f"{project_name}[use]"
             elif dir_choice.data == "delete":
-
-                def delete(func, path_, execinfo):
-                    os.chmod(path_, stat.S_IWUSR)
-                    func(path_)
-
-                shutil.rmtree((project_path).absolute(), onerror=delete)
+                remove_project(project_path)
                 await asyncio.sleep(0.2)
                 return project_name
             else:
@@ -68,134 +63,170 @@ async def check_path(ctx: click.Context) -> str:
             return project_name
 
 
-async def run_git_install(ctx: click.Context, project_name: str):
-    await GitInstallHelp.start_clone(ctx, project_name)
+async def run_git_install(
+    ctx: click.Context,
+    project_name: str,
+    *,
+    partial: bool = False,
+    sparse: list[str] | None = None,
+    reference: Path | None = None,
+    mirror: str | None = None,
+):
+    await GitInstallHelp.start_clone(
+        ctx,
+        project_name,
+        partial=partial,
+        sparse=sparse,
+        reference=reference,
+        mirror=mirror,
+    )
 
 
-async def run_download_install(ctx: click.Context, project_name: str):
-    await DownloadInstallHelp.download_install(ctx, project_name)
+async def run_download_install(
+    ctx: click.Context,
+    project_name: str,
+    link_mode: LinkMode = "auto",
+    single: bool = True,
+) -> bool:
+    return (
+        await DownloadInstallHelp.download_install(ctx, project_name, link_mode, single)
+        is not None
+    )
 
 
-async def setting_env(ctx: click.Context, project_name: str):
-    """设置配置文件
+async def run_stream_install(
+    ctx: click.Context,
+    project_name: str,
+    link_mode: LinkMode = "auto",
+    single: bool = True,
+) -> bool:
+    return (
+        await DownloadInstallHelp.stream_install(ctx, project_name, link_mode, single)
+        is not None
+    )
+
+
+def write_env(project_name: str, superusers: list[str], db_url: str) -> bool:
+    """写入配置文件
 
     参数:
-        ctx: ctx
         project_name: 项目名称
+        superusers: 超级用户QQ
+        db_url: 数据库连接地址，为空则使用sqlite
+
+    返回:
+        bool: 配置文件是否存在
     """
     project_path = Path() / project_name
     env_path = project_path / ".env.dev"
     if not env_path.is_file():
-        ctx.exit()
+        return False
 
     env_file = env_path.read_text(
         encoding="utf-8",
     )
-    superusers = await InputPrompt(
-        "超级用户QQ(即你自己的QQ号，多个用空格隔开):",
-        validator=lambda x: x.replace(" ", "").isdigit(),
-    ).prompt_async(style=CLI_DEFAULT_STYLE)
-    if superusers := superusers.replace(" ", '", "'):
+    if superusers := '", "'.join(superusers):
         env_file = env_file.replace(
             'SUPERUSERS=[""]',
             f'SUPERUSERS=["{superusers}"]',
         )
 
-    db_url = await InputPrompt(
-        "请输入数据库连接地址（为空则使用sqlite）:",
-    ).prompt_async(style=CLI_DEFAULT_STYLE)
     if not db_url:
         (project_path / "data" / "db").mkdir(parents=True, exist_ok=True)
         db_url = "sqlite:data/db/zhenxun.db"
-        env_file = env_file.replace(
-            'DB_URL = ""',
-            f'DB_URL = "{db_url}"',
-        )
+    env_file = env_file.replace(
+        'DB_URL = ""',
+        f'DB_URL = "{db_url}"',
+    )
 
-    env_path.write_text(
+    # 源码可能以硬链接方式复制，写入新文件后替换，避免修改共享的文件
+    tmp_path = env_path.with_name(f"{env_path.name}.tmp")
+    tmp_path.write_text(
         env_file,
         encoding="utf-8",
     )
+    tmp_path.replace(env_path)
+    return True
 
 
-async def install_poetry(
-    project_path: Path,
-    python_path: str,
-    pip_args: list[str] | None = None,
-):
-    """
-    安装包
-    """
-    if pip_args is None:
-        pip_args = []
-    return await asyncio.create_subprocess_exec(
-        python_path,
-        "-m",
-        "pip",
-        "install",
-        "poetry",
-        *pip_args,
-        cwd=project_path.absolute(),
-    )
-
+async def setting_env(ctx: click.Context, project_name: str):
+    """设置配置文件
 
-async def install_package(
-    project_path: Path,
-    python_path: str,
-    package: str,
-    pip_args: list[str] | None = None,
-):
-    """
-    安装包
+    参数:
+        ctx: ctx
+        project_name: 项目名称
     """
-    if pip_args is None:
-        pip_args = []
-    return await asyncio.create_subprocess_exec(
-        python_path,
-        "-m",
-        "poetry",
-        "run",
-        "pip",
-        "install",
-        package,
-        *pip_args,
-        cwd=project_path.absolute(),
-    )
+    if not (Path() / project_name / ".env.dev").is_file():
+        ctx.exit()
+
+    superusers = await InputPrompt(
+        "超级用户QQ(即你自己的QQ号，多个用空格隔开):",
+        validator=lambda x: x.replace(" ", "").isdigit(),
+    ).prompt_async(style=CLI_DEFAULT_STYLE)
+    db_url = await InputPrompt(
+        "请输入数据库连接地址（为空则使用sqlite）:",
+    ).prompt_async(style=CLI_DEFAULT_STYLE)
+    write_env(project_name, superusers.split(), db_url)
 
 
 async def install_dependencies(
     project_name: str,
     python_path: str | None,
     pip_args: list[str] | None = None,
-):
+    installer: str = "auto",
+    wheelhouse: bool = False,
+) -> bool:
+    """安装小真寻依赖
+
+    参数:
+        project_name: 项目名称
+        python_path: python解释器路径
+        pip_args: 额外的pip参数
+        installer: 安装后端(auto/uv/poetry/pip)
+        wheelhouse: 使用本地wheel缓存，首次安装时填充，之后离线安装(仅 uv/pip)
+
+    返回:
+        bool: 是否安装成功
+    """
     if pip_args is None:
         pip_args = []
     if python_path is None:
         python_path = await get_default_python()
+    backend = await get_installer(installer, python_path)
+    if backend is None:
+        click.secho(f"安装方式 {installer} 不可用", fg="red")
+        return False
+    click.secho(f"使用 {backend.name} 安装依赖", fg="yellow")
     project_path = Path() / project_name
-    click.secho("开始安装Poetry包管理器...", fg="yellow")
-    proc = await install_poetry(project_path, python_path, pip_args)
-    await proc.wait()
-    click.secho("Poetry包管理器安装完成！", fg="yellow")
-    click.secho("开始在依赖环境中安装nb-cli...", fg="yellow")
-    proc = await install_package(project_path, python_path, "nb-cli", pip_args)
-    await proc.wait()
-    click.secho("依赖环境中nb-cli安装完成！", fg="yellow")
-    click.secho("开始在依赖环境中安装nb-cli-plugin-zhenxun...", fg="yellow")
-    proc = await install_package(
-        project_path, python_path, "nb-cli-plugin-zhenxun", pip_args
-    )
-    await proc.wait()
-    click.secho("依赖环境中安装nb-cli-plugin-zhenxun安装完成！", fg="yellow")
-    click.secho("开始在依赖环境中安poetry...", fg="yellow")
-    proc = await install_package(project_path, python_path, "poetry", pip_args)
-    await proc.wait()
-    click.secho("依赖环境中poetry安装完成！", fg="yellow")
-    click.secho("开始尝试安装小真寻依赖...", fg="yellow")
-    return await asyncio.create_subprocess_exec(
-        python_path,
-        "-m",
-        "poetry",
-        "install",
-        cwd=project_path.absolute(),
-    )
+    try:
+        steps = await backend.plan(
+            project_path, python_path, pip_args, wheelhouse=wheelhouse
+        )
+    except (OSError, ValueError, KeyError) as e:
+        click.secho(f"读取项目依赖失败: {e}", fg="red")
+        return False
+    if not await run_install_plan(steps, project_path):
+        return False
+    # 记录虚拟环境解释器，run 时无需再启动 poetry
+    await project_python(project_path, python_path, refresh=True)
+    return True
+
+
+async def warmup_project(
+    project_name: str, python_path: str | None, probe: bool = False
+) -> bool:
+    """安装依赖后预编译字节码
+
+    参数:
+        project_name: 项目名称
+        python_path: python解释器路径
+        probe: 是否探测插件导入耗时
+
+    返回:
+        bool: 导入探测是否成功
+    """
+    if python_path is None:
+        python_path = await get_default_python()
+    project_path = Path() / project_name
+    python = await project_python(project_path, python_path)
+    return await warmup(project_path, python, probe=probe)
@@ -1,61 +1,118 @@
+import asyncio
+from collections.abc import Coroutine
 from pathlib import Path
-import signal
-from threading import Event
+from typing import Any, TypeVar
 
-import httpx
-from noneprompt import CancelledError
-import rich.progress
+from ..utils.http_utils import AsyncHttpx, DownloadTask
 
+T = TypeVar("T")
 
-def download_json(url: str):
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """在新的事件循环中运行，结束时关闭该循环中的连接池"""
+
+    async def main() -> T:
+        try:
+            return await coro
+        finally:
+            await AsyncHttpx.aclose()
+
+    return asyncio.run(main())
+
+
+async def async_download_json(url: str | list[str], **kwargs) -> Any:
     """下载json文件
 
-    :param url: url
+    参数:
+        url: url，为列表时作为备用镜像
+        kwargs: 传递给 AsyncHttpx.get 的参数
+
+    返回:
+        Any: json
+    """
+    res = await AsyncHttpx.get(url, follow_redirects=True, **kwargs)
+    res.raise_for_status()
+    return res.json()
+
+
+def download_json(url: str | list[str], **kwargs) -> Any:
+    """下载json文件，不能在事件循环中调用，异步代码请使用 async_download_json
+
+    参数:
+        url: url，为列表时作为备用镜像
+        kwargs: 传递给 AsyncHttpx.get 的参数
+
+    返回:
+        Any: json
     """
-    return httpx.get(url=url, verify=False).json()
+    return _run_sync(async_download_json(url, **kwargs))
 
 
-def download_with_bar(url: str, save_path: Path, show_name: str | None = None):
+async def async_download_files(
+    tasks: list[DownloadTask],
+    *,
+    concurrency: int = 4,
+    verify: bool = True,
+    timeout: int = 30,
+) -> list[bool]:
+    """同时下载多个文件(共用一个汇总进度条)
+
+    取消或某个下载出错时所有未完成的下载一同取消，并删除未下载完的文件
+
+    参数:
+        tasks: 下载任务
+        concurrency: 同时下载的文件数
+        verify: verify
+        timeout: 超时时间
+
+    返回:
+        list[bool]: 各任务是否下载成功
     """
-    下载文件(带进度条)
+    return await AsyncHttpx.download_files(
+        tasks, concurrency=concurrency, verify=verify, timeout=timeout
+    )
+
+
+async def async_download_with_bar(
+    url: str | list[str],
+    save_path: Path,
+    show_name: str | None = None,
+    *,
+    verify: bool = True,
+) -> bool:
+    """下载文件(带进度条)
+
+    参数:
+        url: url，为列表时依次作为备用镜像
+        save_path: 保存路径
+        show_name: 下载时展示的昵称
+        verify: verify
+
+    返回:
+        bool: 是否下载成功
+    """
+    results = await async_download_files(
+        [DownloadTask(url, save_path, show_name)], verify=verify
+    )
+    return results[0]
+
+
+def download_with_bar(
+    url: str | list[str],
+    save_path: Path,
+    show_name: str | None = None,
+    *,
+    verify: bool = True,
+) -> bool:
+    """下载文件(带进度条)，不能在事件循环中调用，异步代码请使用 async_download_with_bar
+
+    参数:
+        url: url，为列表时依次作为备用镜像
+        save_path: 保存路径
+        show_name: 下载时展示的昵称
+        verify: verify
 
-    :param url: url
-    :param save_path: 保存路径
-    :param show_name: 下载时展示的昵称
+    返回:
+        bool: 是否下载成功
     """
-    done_event = Event()
-
-    def handle_sigint(signum, frame):
-        done_event.set()
-
-    signal.signal(signal.SIGINT, handle_sigint)
-
-    save_path.parent.mkdir(parents=True, exist_ok=True)
-    with save_path.open("wb") as f:
-        with httpx.stream(
-            method="GET",
-            url=url,
-            follow_redirects=True,
-            verify=False,
-        ) as datas:
-            size = int(datas.headers["Content-Length"])
-            with rich.progress.Progress(
-                rich.progress.TextColumn("[bold yellow]{task.description}"),
-                rich.progress.BarColumn(),
-                "[progress.percentage]{task.percentage:>3.0f}%",
-                "•",
-                rich.progress.DownloadColumn(),
-                "•",
-                rich.progress.TransferSpeedColumn(),
-                "•",
-                rich.progress.TimeRemainingColumn(),
-            ) as progress:
-                download_task = progress.add_task(
-                    show_name or save_path.name,
-                    total=size,
-                )
-                for data in datas.iter_bytes():
-                    f.write(data)
-                    progress.update(download_task, completed=datas.num_bytes_downloaded)
-                    if done_event.is_set():
-                        raise CancelledError
+    return _run_sync(async_download_with_bar(url, save_path, show_name, verify=verify))
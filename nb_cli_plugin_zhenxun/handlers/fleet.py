@@ -0,0 +1,298 @@
+import asyncio
+import os
+from pathlib import Path
+import sys
+
+import click
+from nb_cli.handlers import (
+    get_default_python,
+    register_signal_handler,
+    remove_signal_handler,
+)
+from pydantic import BaseModel
+
+from .forkserver import DEFAULT_PRELOAD, ForkServer
+from .installer import find_project_python, load_toml, venv_environ
+from .supervisor import READY_PATTERN, RestartPolicy, supervise
+
+INSTANCE_COLORS = ["cyan", "magenta", "blue", "yellow", "green", "red"]
+"""多实例运行时各实例输出前缀的颜色"""
+
+
+def parse_cpus(cpus: str) -> list[int]:
+    """解析CPU核心列表，如 "0-3,6"
+
+    参数:
+        cpus: CPU核心列表
+
+    返回:
+        list[int]: CPU核心编号
+    """
+    result: list[int] = []
+    for part in cpus.split(","):
+        if not (part := part.strip()):
+            continue
+        begin, _, end = part.partition("-")
+        result.extend(range(int(begin), int(end or begin) + 1))
+    return result
+
+
+class InstanceSpec(BaseModel):
+    """单个运行实例配置"""
+
+    cwd: Path
+    """项目目录"""
+    name: str | None = None
+    """实例名称，默认为目录名"""
+    cpus: list[int] = []
+    """绑定的CPU核心，为空时不绑定，配置文件中也可写为字符串，如 0-3,6"""
+    preload: list[str] = []
+    """fork-server 预加载的模块，为空时使用默认列表"""
+
+    @property
+    def display_name(self) -> str:
+        """实例名称"""
+        return self.name or self.cwd.absolute().name
+
+
+class FleetSpec(BaseModel):
+    """运行配置，对应 run 命令中的各个选项"""
+
+    python_interpreter: str | None = None
+    """安装 poetry 的Python解释器路径"""
+    use_poetry: bool = False
+    """通过 poetry run 启动"""
+    refresh_python: bool = False
+    """重新查询虚拟环境解释器路径"""
+    max_restarts: int = 5
+    """restart_window 秒内最多重启次数"""
+    restart_window: float = 300.0
+    """统计重启次数的时间窗口"""
+    backoff_max: float = 60.0
+    """重启前最长等待秒数"""
+    ready_pattern: str = READY_PATTERN
+    """判断启动完成的日志正则"""
+    ready_file: Path | None = None
+    """判断启动完成的文件，相对于项目目录"""
+    fork_server: bool = False
+    """使用 fork-server 启动"""
+    stagger: float = 5.0
+    """多实例时依次启动，前一个实例就绪或等待该秒数后再启动下一个"""
+    instances: list[InstanceSpec]
+    """运行的实例"""
+
+    @classmethod
+    def load(cls, path: Path, **overrides) -> "FleetSpec":
+        """读取 toml 配置文件，实例目录相对于配置文件所在目录
+
+        参数:
+            path: 配置文件路径
+            overrides: 覆盖配置文件的选项
+        """
+        data = {**load_toml(path.read_text(encoding="utf-8")), **overrides}
+        for instance in data.get("instances", []):
+            if isinstance(instance.get("cpus"), str):
+                instance["cpus"] = parse_cpus(instance["cpus"])
+        spec = cls(**data)
+        for instance in spec.instances:
+            if not instance.cwd.is_absolute():
+                instance.cwd = path.parent / instance.cwd
+        return spec
+
+
+def is_zhenxun_project(project_path: Path) -> bool:
+    """目录下是否有小真寻"""
+    return (project_path / "zhenxun").is_dir() and (project_path / "bot.py").is_file()
+
+
+def set_affinity(pid: int, cpus: list[int], prefix: str = ""):
+    """将进程绑定到指定CPU核心，子进程会继承该设置
+
+    参数:
+        pid: 进程id
+        cpus: CPU核心，为空时不绑定
+        prefix: 输出前缀
+    """
+    if not cpus:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        click.echo(prefix + click.style("当前系统不支持绑定CPU核心", fg="yellow"))
+        return
+    try:
+        os.sched_setaffinity(pid, cpus)
+    except OSError as e:
+        click.echo(prefix + click.style(f"绑定CPU核心失败: {e}", fg="yellow"))
+
+
+async def start_bot(
+    project_path: Path, python: str | None, python_path: str, **kwargs
+) -> asyncio.subprocess.Process:
+    """启动 bot.py
+
+    参数:
+        project_path: 项目路径
+        python: 项目虚拟环境中的解释器路径，为空时通过 poetry run 启动
+        python_path: 安装 poetry 的python解释器路径
+        kwargs: 传递给 create_subprocess_exec 的参数
+
+    返回:
+        asyncio.subprocess.Process: 小真寻进程
+    """
+    if python:
+        return await asyncio.create_subprocess_exec(
+            python, "bot.py", cwd=project_path, env=venv_environ(python), **kwargs
+        )
+    return await asyncio.create_subprocess_exec(
+        python_path,
+        "-m",
+        *["poetry", "run", "python", "bot.py"],
+        cwd=project_path,
+        **kwargs,
+    )
+
+
+async def run_instance(
+    instance: InstanceSpec,
+    spec: FleetSpec,
+    python_path: str,
+    *,
+    prefix: str = "",
+    started: asyncio.Event | None = None,
+) -> int:
+    """守护运行单个实例
+
+    参数:
+        instance: 实例配置
+        spec: 运行配置
+        python_path: 安装 poetry 的python解释器路径
+        prefix: 输出前缀
+        started: 首次就绪时设置
+
+    返回:
+        int: 停止守护时的退出码
+    """
+    project_path = instance.cwd
+    python = None
+    if not spec.use_poetry:
+        python = await find_project_python(
+            project_path, python_path, refresh=spec.refresh_python
+        )
+
+    server = None
+    if spec.fork_server:
+        if python:
+            server = await ForkServer.start(
+                python,
+                project_path,
+                instance.preload or DEFAULT_PRELOAD,
+                venv_environ(python),
+                prefix,
+            )
+        else:
+            click.echo(
+                prefix
+                + click.style("未找到项目虚拟环境，无法使用 fork-server", fg="yellow")
+            )
+        if server:
+            set_affinity(server.proc.pid, instance.cpus, prefix)
+
+    async def start():
+        if server and server.alive:
+            return await server.spawn()
+        proc = await start_bot(
+            project_path,
+            python,
+            python_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        set_affinity(proc.pid, instance.cpus, prefix)
+        return proc
+
+    code = await supervise(
+        start,
+        project_path,
+        RestartPolicy(
+            backoff_max=spec.backoff_max,
+            max_restarts=spec.max_restarts,
+            window=spec.restart_window,
+        ),
+        ready_pattern=spec.ready_pattern,
+        ready_file=spec.ready_file and project_path / spec.ready_file,
+        prefix=prefix,
+        started=started,
+    )
+    if server:
+        await server.close()
+    return code
+
+
+async def run_fleet(spec: FleetSpec) -> int:
+    """在同一事件循环中守护运行一个或多个实例
+
+    多个实例依次启动：前一个实例就绪或等待 stagger 秒后再启动下一个，
+    避免同时启动时争抢CPU与磁盘；各实例输出加上实例名前缀
+
+    参数:
+        spec: 运行配置
+
+    返回:
+        int: 全部实例正常停止时为 0，否则为 1
+    """
+    if invalid := [
+        instance.display_name
+        for instance in spec.instances
+        if not is_zhenxun_project(instance.cwd)
+    ]:
+        click.secho(f"未检测到小真寻，请确保目录无误: {', '.join(invalid)}", fg="red")
+        return 1
+    python_path = spec.python_interpreter or await get_default_python()
+
+    stopping = asyncio.Event()
+
+    def shutdown(signum, frame):
+        stopping.set()
+
+    register_signal_handler(shutdown)
+
+    multiple = len(spec.instances) > 1
+    tasks: list[asyncio.Task[int]] = []
+    try:
+        for index, instance in enumerate(spec.instances):
+            if stopping.is_set():
+                break
+            started = asyncio.Event()
+            prefix = f"[{instance.display_name}] " if multiple else ""
+            if prefix and sys.stdout.isatty():
+                # 子进程输出直接写入 stdout，仅在终端中为前缀着色
+                prefix = click.style(
+                    prefix, fg=INSTANCE_COLORS[index % len(INSTANCE_COLORS)]
+                )
+            tasks.append(
+                asyncio.create_task(
+                    run_instance(
+                        instance, spec, python_path, prefix=prefix, started=started
+                    )
+                )
+            )
+            if index == len(spec.instances) - 1 or spec.stagger <= 0:
+                continue
+            waiters = [
+                asyncio.create_task(started.wait()),
+                asyncio.create_task(stopping.wait()),
+            ]
+            await asyncio.wait(
+                [*waiters, tasks[-1]],
+                timeout=spec.stagger,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for waiter in waiters:
+                waiter.cancel()
+        codes = await asyncio.gather(*tasks)
+    finally:
+        remove_signal_handler(shutdown)
+    if multiple:
+        for instance, code in zip(spec.instances, codes):
+            if code:
+                click.secho(f"{instance.display_name} 已停止守护", fg="red")
+    return 1 if any(codes) else 0
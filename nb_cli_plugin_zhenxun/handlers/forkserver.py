@@ -0,0 +1,244 @@
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+import secrets
+import signal
+import sys
+import time
+
+import click
+
+DEFAULT_PRELOAD = [
+    "nonebot",
+    "nonebot.adapters.onebot.v11",
+    "fastapi",
+    "pydantic",
+    "httpx",
+    "tortoise",
+    "PIL.Image",
+    "ujson",
+    "aiofiles",
+]
+"""fork-server 默认预加载的模块，均为导入时无副作用的依赖"""
+
+FORKSERVER_CLOSE_TIMEOUT = 5
+"""关闭 fork-server 时等待其退出的超时时间"""
+
+FORKSERVER_SCRIPT = """
+import importlib, os, runpy, signal, sys, threading
+
+MARKER = sys.argv[1].encode()
+
+
+def send(*args):
+    os.write(1, MARKER + " ".join(map(str, args)).encode() + b"\\n")
+
+
+signal.signal(signal.SIGINT, signal.SIG_IGN)
+sys.path[0] = os.getcwd()
+for name in sys.argv[2:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        send("skip", name, type(e).__name__)
+if threading.active_count() > 1:
+    send("unsafe")
+    sys.exit(0)
+send("ready", len(sys.modules))
+while command := sys.stdin.readline():
+    if command.strip() != "spawn":
+        continue
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        os.dup2(1, 2)
+        sys.argv = ["bot.py"]
+        runpy.run_path("bot.py", run_name="__main__")
+        sys.exit(0)
+    send("pid", pid)
+    _, status = os.waitpid(pid, 0)
+    send("exit", pid, os.waitstatus_to_exitcode(status))
+"""
+"""fork-server 脚本，预加载模块后按 stdin 的指令 fork 子进程运行 bot.py"""
+
+
+class ForkedProcess:
+    """fork-server 中 fork 出的小真寻进程，接口与 asyncio.subprocess.Process 一致"""
+
+    def __init__(self):
+        self.pid: int = 0
+        self.returncode: int | None = None
+        self.stdout = asyncio.StreamReader()
+        self._started = asyncio.Event()
+        self._exited = asyncio.Event()
+
+    def _exit(self, code: int):
+        self.returncode = code
+        self.stdout.feed_eof()
+        self._started.set()
+        self._exited.set()
+
+    def terminate(self):
+        if self.returncode is None and self.pid:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(self.pid, signal.SIGTERM)
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        assert self.returncode is not None
+        return self.returncode
+
+
+class ForkServer:
+    """预加载依赖的常驻解释器，每次启动时 fork 出新进程运行 bot.py，跳过导入阶段"""
+
+    def __init__(
+        self, proc: asyncio.subprocess.Process, marker: bytes, prefix: str = ""
+    ):
+        self.proc = proc
+        self.marker = marker
+        self.prefix = prefix
+        self.current: ForkedProcess | None = None
+        self._pump: asyncio.Task | None = None
+
+    @classmethod
+    def supported(cls) -> bool:
+        """当前系统是否可以安全地 fork"""
+        # macOS 上 fork 后使用系统框架可能崩溃
+        return hasattr(os, "fork") and sys.platform != "darwin"
+
+    @classmethod
+    async def start(
+        cls,
+        python: str,
+        project_path: Path,
+        preload: list[str],
+        env: dict[str, str] | None = None,
+        prefix: str = "",
+    ) -> "ForkServer | None":
+        """启动 fork-server 并等待预加载完成
+
+        参数:
+            python: 项目虚拟环境中的解释器路径
+            project_path: 项目路径
+            preload: 预加载的模块
+            env: 环境变量
+            prefix: 输出前缀
+
+        返回:
+            ForkServer | None: 不支持 fork 或预加载后不安全时为 None
+        """
+        if not cls.supported():
+            click.echo(
+                prefix
+                + click.style("当前系统不支持 fork，使用普通方式启动", fg="yellow")
+            )
+            return None
+        marker = f"@@zhenxun-forkserver-{secrets.token_hex(4)}@@ "
+        click.echo(
+            prefix
+            + click.style(
+                f"启动 fork-server，预加载 {len(preload)} 个模块...", fg="yellow"
+            )
+        )
+        begin = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            python,
+            "-c",
+            FORKSERVER_SCRIPT,
+            marker,
+            *preload,
+            cwd=project_path.absolute(),
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        assert proc.stdout is not None
+        server = cls(proc, marker.encode(), prefix)
+        skipped: list[str] = []
+        while line := await proc.stdout.readline():
+            if not line.startswith(server.marker):
+                sys.stdout.buffer.write(prefix.encode() + line)
+                sys.stdout.buffer.flush()
+                continue
+            kind, *args = line[len(server.marker) :].decode().split()
+            if kind == "skip":
+                skipped.append(f"{args[0]}({args[1]})")
+            elif kind == "unsafe":
+                server._echo("预加载后存在多个线程，fork 不安全，使用普通方式启动")
+                break
+            elif kind == "ready":
+                if skipped:
+                    server._echo(f"预加载失败，已跳过: {', '.join(skipped)}")
+                server._echo(
+                    f"fork-server 就绪，已加载 {args[0]} 个模块，"
+                    f"耗时 {time.perf_counter() - begin:.1f}s",
+                    "green",
+                )
+                server._pump = asyncio.create_task(server._pump_output())
+                return server
+        await server.close()
+        return None
+
+    def _echo(self, message: str, fg: str = "yellow"):
+        click.echo(self.prefix + click.style(message, fg=fg))
+
+    @property
+    def alive(self) -> bool:
+        """fork-server 是否仍在运行"""
+        return self.proc.returncode is None and self._pump is not None
+
+    async def _pump_output(self):
+        """将输出分发给当前子进程，并处理 pid/exit 消息"""
+        assert self.proc.stdout is not None
+        while line := await self.proc.stdout.readline():
+            output, found, message = line.partition(self.marker)
+            current = self.current
+            if output:
+                if current and current.returncode is None:
+                    current.stdout.feed_data(output)
+                else:
+                    sys.stdout.buffer.write(self.prefix.encode() + output)
+                    sys.stdout.buffer.flush()
+            if not found or current is None:
+                continue
+            kind, *args = message.decode().split()
+            if kind == "pid":
+                current.pid = int(args[0])
+                current._started.set()
+            elif kind == "exit":
+                current._exit(int(args[1]))
+        if self.current and self.current.returncode is None:
+            self.current._exit(1)
+
+    async def spawn(self) -> ForkedProcess:
+        """fork 出新进程运行 bot.py
+
+        返回:
+            ForkedProcess: 小真寻进程
+        """
+        assert self.proc.stdin is not None
+        self.current = process = ForkedProcess()
+        self.proc.stdin.write(b"spawn\n")
+        await self.proc.stdin.drain()
+        await process._started.wait()
+        return process
+
+    async def close(self):
+        """关闭 fork-server"""
+        if self.current:
+            self.current.terminate()
+        if self.proc.stdin:
+            self.proc.stdin.close()
+        try:
+            await asyncio.wait_for(self.proc.wait(), FORKSERVER_CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.proc.kill()
+            await self.proc.wait()
+        if self._pump:
+            await self._pump
@@ -0,0 +1,111 @@
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+
+from ..commands import COMMANDS
+
+PACKAGE_NAME = __package__.rpartition(".")[0]
+"""插件包名"""
+
+IMPORT_TIME_SCRIPT = f"""
+import json, sys, time
+
+import nb_cli.cli
+
+begin = time.perf_counter()
+from {PACKAGE_NAME}.plugin import main
+
+main()
+elapsed = time.perf_counter() - begin
+modules = sorted(m for m in sys.modules if m.startswith("{PACKAGE_NAME}"))
+print(json.dumps({{"elapsed": elapsed, "modules": modules}}))
+"""
+"""测量插件加载耗时的脚本，nb-cli 自身的导入不计入"""
+
+EAGER_MODULE_PREFIXES = [
+    f"{PACKAGE_NAME}.commands.",
+    f"{PACKAGE_NAME}.handlers",
+    f"{PACKAGE_NAME}.utils",
+]
+"""加载插件时不应导入的模块"""
+
+
+class ImportTimeResult:
+    """插件加载耗时测量结果"""
+
+    __slots__ = ("elapsed", "modules")
+
+    def __init__(self, elapsed: list[float], modules: list[str]):
+        self.elapsed = elapsed
+        """各次加载耗时(秒)"""
+        self.modules = modules
+        """加载插件后导入的插件模块"""
+
+    @property
+    def median(self) -> float:
+        """耗时中位数(毫秒)"""
+        return statistics.median(self.elapsed) * 1000
+
+    @property
+    def best(self) -> float:
+        """最短耗时(毫秒)"""
+        return min(self.elapsed) * 1000
+
+    @property
+    def eager_modules(self) -> list[str]:
+        """加载插件时被提前导入的模块"""
+        return [
+            module
+            for module in self.modules
+            if any(module.startswith(prefix) for prefix in EAGER_MODULE_PREFIXES)
+        ]
+
+
+async def measure_import_time(rounds: int = 5) -> ImportTimeResult:
+    """在新的解释器中多次加载插件并测量耗时
+
+    参数:
+        rounds: 测量次数
+
+    返回:
+        ImportTimeResult: 测量结果
+    """
+    elapsed: list[float] = []
+    modules: list[str] = []
+    for _ in range(rounds):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            IMPORT_TIME_SCRIPT,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"加载插件失败，退出码: {proc.returncode}")
+        data = json.loads(stdout.decode().strip().splitlines()[-1])
+        elapsed.append(data["elapsed"])
+        modules = data["modules"]
+    return ImportTimeResult(elapsed, modules)
+
+
+def check_command_info() -> list[str]:
+    """检查子命令元信息是否与命令定义一致
+
+    返回:
+        list[str]: 不一致的命令名
+    """
+    mismatched: list[str] = []
+    for name, info in COMMANDS.items():
+        module_name, _, attr = info.import_path.partition(":")
+        module = importlib.import_module(module_name, f"{PACKAGE_NAME}.commands")
+        command = getattr(module, attr)
+        if (
+            command.name != name
+            or command.help != info.help
+            or command.hidden != info.hidden
+            or sorted(getattr(command, "_aliases", None) or []) != sorted(info.aliases)
+        ):
+            mismatched.append(name)
+    return mismatched
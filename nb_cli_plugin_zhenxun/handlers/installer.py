@@ -0,0 +1,542 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import re
+import shutil
+import sys
+import time
+from typing import Any, Protocol
+
+import click
+
+from .wheelhouse import Wheelhouse
+
+if sys.version_info >= (3, 11):
+    from tomllib import loads as _loads
+
+    def load_toml(text: str) -> dict[str, Any]:
+        return _loads(text)
+
+else:
+    from tomlkit import loads as _loads
+
+    def load_toml(text: str) -> dict[str, Any]:
+        return _loads(text).unwrap()
+
+
+BOOTSTRAP_PACKAGES = ["nb-cli", "nb-cli-plugin-zhenxun", "poetry"]
+"""需要额外安装到项目环境中的包"""
+
+VENV_DIR_STRING = ".venv"
+"""pip/uv 安装方式创建的虚拟环境目录名，poetry 会自动识别该目录"""
+
+REQUIREMENTS_FILE_STRING = ".zhenxun-requirements.txt"
+"""pip/uv 安装方式导出的依赖文件名"""
+
+CONSTRAINTS_FILE_STRING = ".zhenxun-constraints.txt"
+"""pip/uv 安装方式导出的 poetry.lock 版本约束文件名"""
+
+PYTHON_POINTER_FILE_STRING = ".zhenxun-python"
+"""记录项目虚拟环境解释器路径的文件名，避免每次启动都查询 poetry"""
+
+POETRY_CONSTRAINT_PATTERN = re.compile(r"(\^|~=|~|[<>!=]=?)?\s*([^\s,<>!=~^]+)")
+"""poetry 版本约束中的单个约束(运算符, 版本号)"""
+
+
+@dataclass
+class InstallStep:
+    """依赖安装步骤"""
+
+    name: str
+    args: list[str]
+    depends_on: list[str] = field(default_factory=list)
+    """前置步骤，全部成功后才会执行；无依赖关系的步骤并行执行"""
+    on_success: Callable[[], None] | None = None
+    """步骤成功后执行的回调"""
+    on_failure: Callable[[], None] | None = None
+    """步骤失败后执行的回调"""
+    required: bool = True
+    """为 False 时失败不影响安装结果，依赖它的步骤改用 fallback_args 执行"""
+    fallback_args: list[str] | None = None
+    """非必需的前置步骤失败时使用的参数"""
+
+
+async def run_install_plan(steps: list[InstallStep], cwd: Path) -> bool:
+    """按依赖关系执行安装步骤，并输出各步骤耗时
+
+    参数:
+        steps: 安装步骤
+        cwd: 工作目录
+
+    返回:
+        bool: 是否全部成功
+    """
+    tasks: dict[str, asyncio.Task[bool]] = {}
+    timings: dict[str, float] = {}
+    required = {step.name: step.required for step in steps}
+
+    async def run_step(step: InstallStep) -> bool:
+        args = step.args
+        for dep in step.depends_on:
+            if await tasks[dep]:
+                continue
+            if required[dep] or step.fallback_args is None:
+                click.secho(f"{step.name}已跳过，前置步骤未成功", fg="red")
+                return False
+            click.secho(f"{dep}未成功，{step.name}改用备用方式", fg="yellow")
+            args = step.fallback_args
+        click.secho(f"开始{step.name}...", fg="yellow")
+        begin = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(*args, cwd=cwd.absolute())
+        code = await proc.wait()
+        timings[step.name] = time.perf_counter() - begin
+        if code != 0:
+            click.secho(
+                f"{step.name}失败！退出码: {code}",
+                fg="red" if step.required else "yellow",
+            )
+            if step.on_failure:
+                step.on_failure()
+            return False
+        if step.on_success:
+            step.on_success()
+        click.secho(f"{step.name}完成！耗时 {timings[step.name]:.1f}s", fg="yellow")
+        return True
+
+    begin = time.perf_counter()
+    for step in steps:
+        tasks[step.name] = asyncio.create_task(run_step(step))
+    results = await asyncio.gather(*tasks.values())
+    click.secho(
+        "依赖安装耗时: "
+        + ", ".join(f"{name} {elapsed:.1f}s" for name, elapsed in timings.items())
+        + f", 总计 {time.perf_counter() - begin:.1f}s",
+        fg="yellow",
+    )
+    return all(result for step, result in zip(steps, results) if step.required)
+
+
+async def _check_command(*args: str) -> bool:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    return await proc.wait() == 0
+
+
+def venv_python(venv_path: Path) -> Path:
+    """虚拟环境中的解释器路径"""
+    if os.name == "nt":
+        return venv_path / "Scripts" / "python.exe"
+    return venv_path / "bin" / "python"
+
+
+async def find_project_python(
+    project_path: Path, python_path: str, *, refresh: bool = False
+) -> str | None:
+    """查找项目虚拟环境中的解释器路径
+
+    依次使用项目 .venv、记录的解释器路径、poetry 管理的虚拟环境，
+    通过 poetry 查询到的路径会写入记录文件供下次使用
+
+    参数:
+        project_path: 项目路径
+        python_path: 安装 poetry 的python解释器路径
+        refresh: 忽略记录的解释器路径，重新查询
+
+    返回:
+        str | None: 解释器路径，找不到时为 None
+    """
+    python = venv_python(project_path / VENV_DIR_STRING)
+    if python.is_file():
+        return str(python.absolute())
+    pointer = project_path / PYTHON_POINTER_FILE_STRING
+    if not refresh and pointer.is_file():
+        python = Path(pointer.read_text(encoding="utf-8").strip())
+        if python.is_file():
+            return str(python)
+    proc = await asyncio.create_subprocess_exec(
+        python_path,
+        "-m",
+        "poetry",
+        "env",
+        "info",
+        "-p",
+        cwd=project_path.absolute(),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    if proc.returncode == 0 and (venv_path := stdout.decode().strip()):
+        python = venv_python(Path(venv_path))
+        if python.is_file():
+            pointer.write_text(str(python), encoding="utf-8")
+            return str(python)
+    return None
+
+
+async def project_python(
+    project_path: Path, python_path: str, *, refresh: bool = False
+) -> str:
+    """项目依赖环境中的解释器路径
+
+    参数:
+        project_path: 项目路径
+        python_path: 安装 poetry 的python解释器路径
+        refresh: 忽略记录的解释器路径，重新查询
+
+    返回:
+        str: 解释器路径，找不到时返回 python_path
+    """
+    return (
+        await find_project_python(project_path, python_path, refresh=refresh)
+        or python_path
+    )
+
+
+def venv_environ(python: str) -> dict[str, str]:
+    """直接使用虚拟环境解释器时的环境变量，与 poetry run 一致
+
+    参数:
+        python: 虚拟环境中的解释器路径
+
+    返回:
+        dict[str, str]: 环境变量
+    """
+    bin_path = Path(python).parent
+    env = os.environ.copy()
+    env.pop("PYTHONHOME", None)
+    env["VIRTUAL_ENV"] = str(bin_path.parent)
+    env["PATH"] = os.pathsep.join([str(bin_path), env.get("PATH", "")])
+    return env
+
+
+def _poetry_constraint(version: str) -> str:
+    """将 poetry 版本约束转换为 PEP 440 格式"""
+    if "||" in version:
+        # PEP 440 无法表示"或"，交由 poetry.lock 的版本约束决定
+        return ""
+    specs: list[str] = []
+    # 约束之间可用逗号或空格分隔，运算符与版本号之间也可有空格
+    for operator, base in POETRY_CONSTRAINT_PATTERN.findall(version):
+        if base == "*":
+            continue
+        if operator in {"^", "~"}:
+            numbers = [int(n) for n in re.findall(r"\d+", base)[:3]]
+            if operator == "^":
+                index = next((i for i, n in enumerate(numbers) if n), len(numbers) - 1)
+            else:
+                index = 1 if len(numbers) > 1 else 0
+            upper = [*numbers[:index], numbers[index] + 1]
+            specs.append(f">={base},<{'.'.join(map(str, upper))}")
+        elif operator in {"", "="}:
+            specs.append(f"=={base}")
+        else:
+            specs.append(f"{operator}{base}")
+    return ",".join(specs)
+
+
+def _python_marker(version: str) -> str:
+    """将 poetry 的 python 版本约束转换为 PEP 508 环境标记"""
+    groups: list[str] = []
+    for group in version.split("||"):
+        markers = []
+        for spec in filter(None, _poetry_constraint(group).split(",")):
+            operator, number = re.match(r"([<>=!~]*)(.*)", spec).groups()  # type: ignore
+            variable = (
+                "python_full_version" if number.count(".") > 1 else "python_version"
+            )
+            markers.append(f'{variable} {operator} "{number}"')
+        if not markers:
+            return ""
+        groups.append(" and ".join(markers))
+    return " or ".join(f"({group})" if len(groups) > 1 else group for group in groups)
+
+
+def _poetry_requirement(name: str, spec: Any) -> str | None:
+    """将 [tool.poetry.dependencies] 中的一项转换为 PEP 508 依赖"""
+    if isinstance(spec, list):
+        # 多约束依赖交由 poetry.lock 的版本约束决定
+        return name
+    if isinstance(spec, str):
+        return f"{name}{_poetry_constraint(spec)}"
+    if spec.get("optional"):
+        return None
+    extras = f"[{','.join(spec['extras'])}]" if spec.get("extras") else ""
+    if "git" in spec:
+        ref = spec.get("rev") or spec.get("tag") or spec.get("branch")
+        requirement = f"{name}{extras} @ git+{spec['git']}{f'@{ref}' if ref else ''}"
+    elif "url" in spec:
+        requirement = f"{name}{extras} @ {spec['url']}"
+    elif "path" in spec:
+        requirement = f"{name}{extras} @ {Path(spec['path']).absolute().as_uri()}"
+    else:
+        requirement = f"{name}{extras}{_poetry_constraint(spec.get('version', '*'))}"
+    markers = [
+        marker
+        for marker in (spec.get("markers"), _python_marker(spec.get("python", "*")))
+        if marker
+    ]
+    if markers:
+        requirement += "; " + " and ".join(
+            f"({marker})" if len(markers) > 1 else marker for marker in markers
+        )
+    return requirement
+
+
+def export_requirements(project_path: Path) -> tuple[list[str], list[str]]:
+    """从 pyproject.toml 与 poetry.lock 导出依赖列表与版本约束
+
+    参数:
+        project_path: 项目路径
+
+    返回:
+        tuple[list[str], list[str]]: (依赖, 锁定版本约束)
+    """
+    pyproject = load_toml((project_path / "pyproject.toml").read_text("utf-8"))
+    requirements: list[str] = list(pyproject.get("project", {}).get("dependencies", []))
+    poetry_deps = pyproject.get("tool", {}).get("poetry", {}).get("dependencies", {})
+    for name, spec in poetry_deps.items():
+        if name.lower() != "python" and (
+            requirement := _poetry_requirement(name, spec)
+        ):
+            requirements.append(requirement)
+    constraints: list[str] = []
+    lock_file = project_path / "poetry.lock"
+    if lock_file.is_file():
+        lock = load_toml(lock_file.read_text("utf-8"))
+        constraints = [
+            f"{package['name']}=={package['version']}"
+            for package in lock.get("package", [])
+            if package.get("source", {}).get("type") not in {"git", "url", "directory"}
+        ]
+    return requirements, constraints
+
+
+def write_requirement_files(project_path: Path) -> list[str]:
+    """导出依赖文件与版本约束文件到项目目录
+
+    参数:
+        project_path: 项目路径
+
+    返回:
+        list[str]: 依赖参数(-r/-c/包名)，依赖与工具包在同一次解析中安装
+    """
+    requirements, constraints = export_requirements(project_path)
+    requirements_file = project_path.absolute() / REQUIREMENTS_FILE_STRING
+    constraints_file = project_path.absolute() / CONSTRAINTS_FILE_STRING
+    requirements_file.write_text("\n".join(requirements), encoding="utf-8")
+    constraints_file.write_text("\n".join(constraints), encoding="utf-8")
+    return [
+        "-r",
+        str(requirements_file),
+        "-c",
+        str(constraints_file),
+        *BOOTSTRAP_PACKAGES,
+    ]
+
+
+class InstallerBackend(Protocol):
+    """依赖安装后端"""
+
+    name: str
+
+    async def is_available(self, python_path: str) -> bool: ...
+
+    async def plan(
+        self,
+        project_path: Path,
+        python_path: str,
+        pip_args: list[str],
+        *,
+        wheelhouse: bool = False,
+    ) -> list[InstallStep]: ...
+
+
+class PoetryInstaller:
+    """poetry 安装后端"""
+
+    name = "poetry"
+
+    async def is_available(self, python_path: str) -> bool:
+        return True
+
+    async def plan(
+        self,
+        project_path: Path,
+        python_path: str,
+        pip_args: list[str],
+        *,
+        wheelhouse: bool = False,
+    ) -> list[InstallStep]:
+        # poetry 无法从本地 wheel 目录离线安装，忽略 wheelhouse
+        steps: list[InstallStep] = []
+        poetry_depends: list[str] = []
+        if not await _check_command(python_path, "-m", "poetry", "--version"):
+            steps.append(
+                InstallStep(
+                    "安装Poetry包管理器",
+                    [python_path, "-m", "pip", "install", "poetry", *pip_args],
+                )
+            )
+            poetry_depends = ["安装Poetry包管理器"]
+        # poetry install 与 pip install 会同时写入同一个虚拟环境，因此需要串行
+        return [
+            *steps,
+            InstallStep(
+                "安装小真寻依赖",
+                [python_path, "-m", "poetry", "install"],
+                poetry_depends,
+            ),
+            InstallStep(
+                "在依赖环境中安装nb-cli等工具",
+                [
+                    python_path,
+                    "-m",
+                    "poetry",
+                    "run",
+                    "pip",
+                    "install",
+                    *BOOTSTRAP_PACKAGES,
+                    *pip_args,
+                ],
+                ["安装小真寻依赖"],
+            ),
+        ]
+
+
+class PipInstaller:
+    """pip 安装后端，按 poetry.lock 锁定的版本安装到项目 .venv"""
+
+    name = "pip"
+
+    async def is_available(self, python_path: str) -> bool:
+        return await _check_command(python_path, "-m", "pip", "--version")
+
+    def _install_args(self, project_path: Path, python: Path) -> list[str]:
+        return [str(python), "-m", "pip", "install"]
+
+    def _venv_args(self, python_path: str, venv_path: Path) -> list[str]:
+        return [python_path, "-m", "venv", str(venv_path)]
+
+    async def _pip_command(self, python_path: str) -> list[str]:
+        """填充wheel缓存所用的 pip 命令"""
+        return [python_path, "-m", "pip"]
+
+    async def plan(
+        self,
+        project_path: Path,
+        python_path: str,
+        pip_args: list[str],
+        *,
+        wheelhouse: bool = False,
+    ) -> list[InstallStep]:
+        project_path = project_path.absolute()
+        venv_path = project_path / VENV_DIR_STRING
+        requirement_args = write_requirement_files(project_path)
+        steps: list[InstallStep] = []
+        if not venv_python(venv_path).is_file():
+            steps.append(
+                InstallStep("创建虚拟环境", self._venv_args(python_path, venv_path))
+            )
+        if wheelhouse:
+            key = await Wheelhouse.key(project_path, python_path)
+            if Wheelhouse.has(key):
+                click.secho("使用本地wheel缓存离线安装依赖", fg="yellow")
+                Wheelhouse.touch(key)
+            else:
+                # 与创建虚拟环境互不依赖，并行执行；失败时改为在线安装
+                build_dir = Wheelhouse.build_dir(key)
+                steps.append(
+                    InstallStep(
+                        "下载依赖到本地wheel缓存",
+                        Wheelhouse.build_args(
+                            await self._pip_command(python_path),
+                            build_dir,
+                            requirement_args,
+                            pip_args,
+                        ),
+                        on_success=lambda: Wheelhouse.commit(key, build_dir),
+                        on_failure=lambda: Wheelhouse.discard(build_dir),
+                        required=False,
+                    )
+                )
+        install_args = [
+            *self._install_args(project_path, venv_python(venv_path)),
+            *requirement_args,
+        ]
+        steps.append(
+            InstallStep(
+                "安装小真寻依赖",
+                [*install_args, *Wheelhouse.offline_args()]
+                if wheelhouse
+                else [*install_args, *pip_args],
+                [step.name for step in steps],
+                fallback_args=[*install_args, *pip_args],
+            )
+        )
+        return steps
+
+
+class UvInstaller(PipInstaller):
+    """uv 安装后端，使用 uv 的并行解析与全局缓存"""
+
+    name = "uv"
+
+    def __init__(self):
+        self.command: list[str] = []
+
+    async def is_available(self, python_path: str) -> bool:
+        if uv := shutil.which("uv"):
+            self.command = [uv]
+        elif await _check_command(python_path, "-m", "uv", "--version"):
+            self.command = [python_path, "-m", "uv"]
+        return bool(self.command)
+
+    def _install_args(self, project_path: Path, python: Path) -> list[str]:
+        return [*self.command, "pip", "install", "--python", str(python)]
+
+    def _venv_args(self, python_path: str, venv_path: Path) -> list[str]:
+        return [*self.command, "venv", "--python", python_path, str(venv_path)]
+
+    async def _pip_command(self, python_path: str) -> list[str]:
+        if await _check_command(python_path, "-m", "pip", "--version"):
+            return [python_path, "-m", "pip"]
+        # 解释器没有 pip 时由 uv 提供临时的 pip 环境，wheel 仍按该解释器构建
+        return [
+            *self.command,
+            *["tool", "run", "--python", python_path, "--from", "pip", "pip"],
+        ]
+
+
+INSTALLERS: dict[str, type[InstallerBackend]] = {
+    "uv": UvInstaller,
+    "poetry": PoetryInstaller,
+    "pip": PipInstaller,
+}
+"""可用的安装后端，auto 时按顺序检测"""
+
+
+async def get_installer(name: str, python_path: str) -> InstallerBackend | None:
+    """获取安装后端
+
+    参数:
+        name: 后端名称，auto 时自动检测
+        python_path: python解释器路径
+
+    返回:
+        InstallerBackend | None: 不可用时为 None
+    """
+    for backend_name, backend_cls in INSTALLERS.items():
+        if name not in {"auto", backend_name}:
+            continue
+        backend = backend_cls()
+        if await backend.is_available(python_path):
+            return backend
+    return None
@@ -0,0 +1,246 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+import contextlib
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+import random
+import re
+import sys
+import time
+
+import click
+from nb_cli.handlers import (
+    register_signal_handler,
+    remove_signal_handler,
+    terminate_process,
+)
+
+from .forkserver import ForkedProcess
+
+READY_PATTERN = r"Application startup complete"
+"""默认的就绪日志，nonebot 启动完成时输出"""
+
+RESTART_LOG_FILE_STRING = ".zhenxun-restarts.jsonl"
+"""守护模式下每次启动的退出码与就绪耗时记录文件名"""
+
+OUTPUT_DRAIN_TIMEOUT = 5
+"""进程退出后等待输出读取完毕的超时时间"""
+
+ANSI_PATTERN = re.compile(rb"\x1b\[[0-9;]*m")
+"""终端颜色控制符"""
+
+
+@dataclass
+class RestartPolicy:
+    """崩溃重启策略"""
+
+    backoff_base: float = 1.0
+    """首次重启前的等待秒数，之后每次翻倍"""
+    backoff_max: float = 60.0
+    """重启前最长等待秒数"""
+    max_restarts: int = 5
+    """window 秒内最多重启次数，超过后停止守护"""
+    window: float = 300.0
+    """统计重启次数的时间窗口，单次运行超过该时间后退避重置"""
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次连续重启前的等待秒数(带随机抖动)"""
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class RunRecord:
+    """单次启动记录"""
+
+    started_at: float
+    """启动时间戳"""
+    ready: float | None = None
+    """启动到就绪的秒数，未就绪为 None"""
+    uptime: float = 0
+    """运行秒数"""
+    exit_code: int | None = None
+    """退出码"""
+
+
+def _echo(prefix: str, message: str, fg: str):
+    click.echo(prefix + click.style(message, fg=fg))
+
+
+async def _watch_output(
+    stream: asyncio.StreamReader,
+    pattern: re.Pattern[str] | None,
+    ready: asyncio.Event,
+    prefix: bytes = b"",
+):
+    """转发子进程输出(每行加上前缀)，并在匹配到就绪日志时标记就绪"""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # 单行超过缓冲区上限时按块读取
+            line = await stream.read(2**16)
+        if not line:
+            return
+        sys.stdout.buffer.write(prefix + line)
+        sys.stdout.buffer.flush()
+        if pattern and not ready.is_set():
+            text = ANSI_PATTERN.sub(b"", line).decode(errors="ignore")
+            if pattern.search(text):
+                ready.set()
+
+
+async def _watch_file(path: Path, ready: asyncio.Event):
+    """等待就绪文件出现"""
+    while not ready.is_set():
+        if path.exists():
+            ready.set()
+        else:
+            await asyncio.sleep(0.2)
+
+
+async def _report_ready(
+    record: RunRecord,
+    ready: asyncio.Event,
+    begin: float,
+    prefix: str,
+    started: asyncio.Event | None,
+):
+    """就绪后记录并输出就绪耗时"""
+    await ready.wait()
+    record.ready = time.perf_counter() - begin
+    _echo(prefix, f"小真寻已就绪，耗时 {record.ready:.1f}s", "green")
+    if started:
+        started.set()
+
+
+def _save_record(project_path: Path, record: RunRecord):
+    with (project_path / RESTART_LOG_FILE_STRING).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(asdict(record)) + "\n")
+
+
+def _print_summary(records: list[RunRecord], prefix: str):
+    ready = [record.ready for record in records if record.ready is not None]
+    if len(records) < 2 or not ready:
+        return
+    _echo(
+        prefix,
+        f"共启动 {len(records)} 次，就绪耗时: "
+        f"平均 {sum(ready) / len(ready):.1f}s, "
+        f"最短 {min(ready):.1f}s, 最长 {max(ready):.1f}s",
+        "yellow",
+    )
+
+
+async def supervise(
+    start: Callable[[], Awaitable[asyncio.subprocess.Process | ForkedProcess]],
+    project_path: Path,
+    policy: RestartPolicy,
+    *,
+    ready_pattern: str | None = READY_PATTERN,
+    ready_file: Path | None = None,
+    prefix: str = "",
+    started: asyncio.Event | None = None,
+) -> int:
+    """守护运行小真寻，异常退出时按退避策略重启
+
+    子进程的输出需为管道(stdout=PIPE, stderr=STDOUT)，用于检测就绪日志
+
+    参数:
+        start: 启动子进程，可为 fork-server 中 fork 出的进程
+        project_path: 项目路径，启动记录写入该目录
+        policy: 重启策略
+        ready_pattern: 就绪日志的正则，为空时不检测日志
+        ready_file: 就绪文件，小真寻就绪后创建
+        prefix: 输出前缀，多实例运行时区分各实例
+        started: 首次就绪时设置
+
+    返回:
+        int: 停止守护时的退出码，正常退出或收到退出信号时为 0
+    """
+    should_exit = asyncio.Event()
+
+    def shutdown(signum, frame):
+        should_exit.set()
+
+    register_signal_handler(shutdown)
+
+    pattern = re.compile(ready_pattern) if ready_pattern else None
+    records: list[RunRecord] = []
+    restarts: deque[float] = deque()
+    attempt = 0
+    code = 0
+    try:
+        while not should_exit.is_set():
+            if ready_file:
+                ready_file.unlink(missing_ok=True)
+            record = RunRecord(started_at=time.time())
+            records.append(record)
+            begin = time.perf_counter()
+            proc = await start()
+            assert proc.stdout is not None
+
+            ready = asyncio.Event()
+            output = asyncio.create_task(
+                _watch_output(proc.stdout, pattern, ready, prefix.encode())
+            )
+            watchers = [output]
+            if ready_file:
+                watchers.append(asyncio.create_task(_watch_file(ready_file, ready)))
+            watchers.append(
+                asyncio.create_task(
+                    _report_ready(record, ready, begin, prefix, started)
+                )
+            )
+            exit_wait = asyncio.create_task(should_exit.wait())
+            proc_wait = asyncio.create_task(proc.wait())
+            await asyncio.wait(
+                {exit_wait, proc_wait}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if isinstance(proc, ForkedProcess):
+                proc.terminate()
+            elif not proc_wait.done():
+                await terminate_process(proc)
+            code = await proc_wait
+            exit_wait.cancel()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(output), OUTPUT_DRAIN_TIMEOUT)
+            for watcher in watchers:
+                watcher.cancel()
+
+            record.uptime = time.perf_counter() - begin
+            record.exit_code = code
+            _save_record(project_path, record)
+            if should_exit.is_set() or code == 0:
+                code = 0
+                break
+
+            now = time.monotonic()
+            if record.uptime >= policy.window:
+                attempt = 0
+            restarts.append(now)
+            while restarts and now - restarts[0] > policy.window:
+                restarts.popleft()
+            if len(restarts) > policy.max_restarts:
+                _echo(
+                    prefix,
+                    f"{policy.window:.0f}s 内重启超过 {policy.max_restarts} 次，"
+                    "停止守护",
+                    "red",
+                )
+                break
+            delay = policy.delay(attempt)
+            attempt += 1
+            _echo(
+                prefix,
+                f"小真寻异常退出(退出码: {code})，{delay:.1f}s 后重启...",
+                "yellow",
+            )
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(should_exit.wait(), delay)
+    finally:
+        remove_signal_handler(shutdown)
+    _print_summary(records, prefix)
+    return code
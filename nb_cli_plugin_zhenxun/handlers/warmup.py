@@ -0,0 +1,147 @@
+import asyncio
+import json
+from pathlib import Path
+import re
+import time
+
+import click
+
+IMPORT_PROBE_TIMEOUT = 300
+"""导入探测超时时间(秒)"""
+
+IMPORT_PROBE_SCRIPT = """
+import runpy
+import sys
+
+import nonebot
+
+sys.path.insert(0, "")
+nonebot.run = lambda *args, **kwargs: None
+runpy.run_path("bot.py", run_name="__main__")
+"""
+"""导入探测脚本，执行 bot.py 加载全部插件但不启动"""
+
+IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<name>.+)$"
+)
+"""-X importtime 输出格式"""
+
+
+async def _site_packages(python: str) -> list[str]:
+    proc = await asyncio.create_subprocess_exec(
+        python,
+        "-c",
+        "import json, sysconfig;"
+        "paths = sysconfig.get_paths();"
+        "print(json.dumps(sorted({paths['purelib'], paths['platlib']})))",
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    try:
+        return [path for path in json.loads(stdout) if Path(path).is_dir()]
+    except ValueError:
+        return []
+
+
+async def compile_bytecode(project_path: Path, python: str) -> bool:
+    """使用全部CPU核心并行预编译项目与依赖环境的字节码
+
+    参数:
+        project_path: 项目路径
+        python: 依赖环境中的解释器路径
+
+    返回:
+        bool: 是否全部编译成功
+    """
+    targets = [
+        str(path.absolute())
+        for path in (project_path / "zhenxun", project_path / "bot.py")
+        if path.exists()
+    ]
+    targets.extend(await _site_packages(python))
+    click.secho("开始预编译字节码...", fg="yellow")
+    begin = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        python, "-m", "compileall", "-q", "-j", "0", *targets
+    )
+    code = await proc.wait()
+    elapsed = time.perf_counter() - begin
+    if code != 0:
+        # 依赖中的测试文件、模板等可能无法编译，不影响运行
+        click.secho(f"部分文件预编译失败，耗时 {elapsed:.1f}s", fg="yellow")
+        return False
+    click.secho(f"预编译字节码完成！耗时 {elapsed:.1f}s", fg="yellow")
+    return True
+
+
+async def probe_imports(
+    project_path: Path, python: str, top: int = 10
+) -> list[tuple[str, int]] | None:
+    """执行 bot.py 加载全部插件(不启动)，统计导入耗时
+
+    参数:
+        project_path: 项目路径
+        python: 依赖环境中的解释器路径
+        top: 返回最慢的模块个数
+
+    返回:
+        list[tuple[str, int]] | None: (模块, 自身导入耗时微秒)，探测失败时为 None
+    """
+    click.secho("开始探测插件导入耗时...", fg="yellow")
+    proc = await asyncio.create_subprocess_exec(
+        python,
+        "-X",
+        "importtime",
+        "-c",
+        IMPORT_PROBE_SCRIPT,
+        cwd=project_path.absolute(),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), IMPORT_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        click.secho("探测插件导入超时", fg="red")
+        return None
+    timings: list[tuple[str, int]] = []
+    other_lines: list[str] = []
+    for line in stderr.decode(errors="replace").splitlines():
+        if matched := IMPORT_TIME_PATTERN.match(line):
+            timings.append((matched["name"].strip(), int(matched["self"])))
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+    if proc.returncode != 0:
+        click.secho("\n".join(other_lines[-20:]), fg="red")
+        click.secho(f"探测插件导入失败，退出码: {proc.returncode}", fg="red")
+        return None
+    total = sum(us for _, us in timings)
+    click.secho(
+        f"共导入 {len(timings)} 个模块，导入耗时 {total / 1e6:.2f}s，最慢的模块:",
+        fg="yellow",
+    )
+    slowest = sorted(timings, key=lambda item: item[1], reverse=True)[:top]
+    for name, us in slowest:
+        click.secho(f"  {us / 1000:>8.1f}ms  {name}")
+    return slowest
+
+
+async def warmup(
+    project_path: Path, python: str, *, probe: bool = False, top: int = 10
+) -> bool:
+    """预热项目：预编译字节码，并可选地探测插件导入耗时
+
+    参数:
+        project_path: 项目路径
+        python: 依赖环境中的解释器路径
+        probe: 是否探测插件导入耗时
+        top: 报告最慢的模块个数
+
+    返回:
+        bool: 导入探测是否成功(未探测时为 True)
+    """
+    await compile_bytecode(project_path, python)
+    if probe:
+        return await probe_imports(project_path, python, top) is not None
+    return True
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+from ..utils.const import WHEELHOUSE_PATH
+
+WHEELS_PATH = WHEELHOUSE_PATH / "wheels"
+"""wheel 文件池，按文件名(包名-版本-标签)去重"""
+
+MANIFESTS_PATH = WHEELHOUSE_PATH / "manifests"
+"""按 poetry.lock 与解释器标签的哈希记录所需 wheel 的清单"""
+
+BUILD_PATH = WHEELHOUSE_PATH / "build"
+"""构建中的临时目录"""
+
+DEFAULT_MAX_SIZE = 2 * 1024**3
+"""默认的wheel缓存大小上限"""
+
+
+class Wheelhouse:
+    @classmethod
+    async def key(cls, project_path: Path, python_path: str) -> str:
+        """由 poetry.lock 内容与解释器版本、平台生成的缓存键
+
+        参数:
+            project_path: 项目路径
+            python_path: python解释器路径
+        """
+        proc = await asyncio.create_subprocess_exec(
+            python_path,
+            "-c",
+            "import sys, sysconfig;"
+            "print(sys.implementation.cache_tag, sysconfig.get_platform())",
+            stdout=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        lock_file = project_path / "poetry.lock"
+        digest = hashlib.sha256(stdout.strip())
+        if lock_file.is_file():
+            digest.update(lock_file.read_bytes())
+        else:
+            digest.update((project_path / "pyproject.toml").read_bytes())
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    async def base_python(cls, python_path: str) -> str:
+        """虚拟环境对应的基础解释器(uv 创建的虚拟环境不带 pip)
+
+        参数:
+            python_path: python解释器路径
+        """
+        proc = await asyncio.create_subprocess_exec(
+            python_path,
+            "-c",
+            "import sys; print(getattr(sys, '_base_executable', sys.executable))",
+            stdout=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        return stdout.decode().strip() or python_path
+
+    @classmethod
+    def _manifest(cls, key: str) -> Path:
+        return MANIFESTS_PATH / f"{key}.json"
+
+    @classmethod
+    def has(cls, key: str) -> bool:
+        """缓存中是否已有该键所需的全部 wheel"""
+        try:
+            manifest = json.loads(cls._manifest(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return all((WHEELS_PATH / wheel).is_file() for wheel in manifest["wheels"])
+
+    @classmethod
+    def touch(cls, key: str):
+        """更新最近使用时间"""
+        manifest_file = cls._manifest(key)
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        manifest["last_used"] = time.time()
+        manifest_file.write_text(json.dumps(manifest), encoding="utf-8")
+
+    @classmethod
+    def build_dir(cls, key: str) -> Path:
+        """创建本次构建独立的临时目录，避免同时构建时互相删除"""
+        BUILD_PATH.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=f"{key}-", dir=BUILD_PATH))
+
+    @classmethod
+    def discard(cls, build_dir: Path):
+        """构建失败时删除构建目录"""
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    @classmethod
+    def build_args(
+        cls,
+        pip_command: list[str],
+        build_dir: Path,
+        install_args: list[str],
+        pip_args: list[str],
+    ) -> list[str]:
+        """下载并构建 wheel 的 pip 命令，已缓存的 wheel 直接复用
+
+        参数:
+            pip_command: 目标解释器的 pip 命令，如 [python, "-m", "pip"]
+            build_dir: 构建目录
+            install_args: 依赖参数(-r/-c/包名)
+            pip_args: 额外的pip参数
+        """
+        WHEELS_PATH.mkdir(parents=True, exist_ok=True)
+        return [
+            *pip_command,
+            "wheel",
+            "--find-links",
+            str(WHEELS_PATH),
+            "-w",
+            str(build_dir),
+            *install_args,
+            *pip_args,
+        ]
+
+    @classmethod
+    def commit(cls, key: str, build_dir: Path):
+        """将构建目录中的 wheel 移入文件池并写入清单"""
+        wheels: list[str] = []
+        for wheel in build_dir.glob("*.whl"):
+            target = WHEELS_PATH / wheel.name
+            if not target.exists():
+                wheel.replace(target)
+            wheels.append(wheel.name)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        MANIFESTS_PATH.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        cls._manifest(key).write_text(
+            json.dumps({"wheels": sorted(wheels), "created": now, "last_used": now}),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def offline_args(cls) -> list[str]:
+        """从文件池离线安装的参数"""
+        return ["--no-index", "--find-links", str(WHEELS_PATH)]
+
+    @classmethod
+    def prune(cls, max_size: int = DEFAULT_MAX_SIZE) -> tuple[int, int]:
+        """按最近使用时间淘汰清单，并删除不再被引用的 wheel
+
+        参数:
+            max_size: 缓存大小上限(字节)
+
+        返回:
+            tuple[int, int]: (删除的 wheel 数, 释放的字节数)
+        """
+        manifests: list[tuple[float, Path, set[str]]] = []
+        for manifest_file in MANIFESTS_PATH.glob("*.json"):
+            try:
+                manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+                wheels = set(manifest["wheels"])
+                last_used = manifest.get("last_used", 0)
+            except (OSError, ValueError, KeyError):
+                manifest_file.unlink(missing_ok=True)
+                continue
+            manifests.append((last_used, manifest_file, wheels))
+        manifests.sort(key=lambda m: m[0])
+        sizes = {
+            wheel.name: wheel.stat().st_size for wheel in WHEELS_PATH.glob("*.whl")
+        }
+
+        def referenced() -> set[str]:
+            return {wheel for _, _, wheels in manifests for wheel in wheels}
+
+        while manifests and sum(sizes.get(w, 0) for w in referenced()) > max_size:
+            _, manifest_file, _ = manifests.pop(0)
+            manifest_file.unlink(missing_ok=True)
+
+        keep = referenced()
+        removed, freed = 0, 0
+        for name, size in sizes.items():
+            if name not in keep:
+                (WHEELS_PATH / name).unlink(missing_ok=True)
+                removed += 1
+                freed += size
+        return removed, freed
@@ -0,0 +1,16 @@
+from nb_cli.handlers import CACHE_DIR
+
+CACHE_PATH = CACHE_DIR / "zhenxun"
+"""插件缓存目录"""
+
+MIRROR_SCORE_FILE = CACHE_PATH / "mirror_scores.json"
+"""镜像评分缓存文件"""
+
+WHEELHOUSE_PATH = CACHE_PATH / "wheelhouse"
+"""本地wheel缓存目录"""
+
+API_CACHE_PATH = CACHE_PATH / "api"
+"""仓库 api 响应缓存目录"""
+
+SOURCE_CACHE_PATH = CACHE_PATH / "sources"
+"""按仓库 tree sha 缓存的小真寻源码目录"""
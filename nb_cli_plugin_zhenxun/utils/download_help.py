@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 import shutil
 import zipfile
@@ -5,58 +6,177 @@ import zipfile
 import click
 
 from ..utils.github_utils import GithubUtils
+from ..utils.github_utils.models import GitHubStrategy, RepoInfo, TreeInfo
 from ..utils.http_utils import AsyncHttpx
+from .source_cache import LinkMode, SourceCache
+from .update_help import UpdateHelp
 
-TMP_PATH = Path() / "tmp"
 DOWNLOAD_ZIP_FILE_STRING = "download_latest_file.zip"
 
 
 class DownloadInstallHelp:
     DEFAULT_GITHUB_URL = "https://github.com/HibiKier/zhenxun_bot/tree/main"
+    DOWNLOAD_CONCURRENCY = 4
 
     @classmethod
-    async def download_install(cls, ctx: click.Context, project_name: str) -> str:
-        """下载文件
+    async def _tree_info(cls, repo_info: RepoInfo) -> TreeInfo | None:
+        """分支最新的文件列表，其 tree sha 作为源码缓存键，获取失败时不使用缓存"""
+        try:
+            return await GitHubStrategy.parse_repo_info(repo_info)
+        except Exception:
+            return None
+
+    @classmethod
+    async def install(
+        cls,
+        ctx: click.Context,
+        project_name: str,
+        *,
+        stream: bool = False,
+        link_mode: LinkMode = "auto",
+        single: bool = True,
+    ) -> str | None:
+        """下载小真寻源码，同一版本只下载一次，之后从本地缓存复制
+
+        只创建一个项目且无法以硬链接/reflink 复制时，新下载的源码直接移动到项目中，
+        不再额外保存一份缓存；完成后写入增量更新清单
 
         参数:
             ctx: ctx
+            project_name: 项目名称
+            stream: 边下载边解压，失败时回退到下载压缩包
+            link_mode: 从缓存复制源码的方式
+            single: 是否只创建一个项目
+
+        返回:
+            str | None: 下载失败时为 None
         """
-        click.secho("开始下载小真寻项目...", fg="yellow")
         repo_info = GithubUtils.parse_github_url(cls.DEFAULT_GITHUB_URL)
-        url = await repo_info.get_archive_download_urls()
-        if not url:
-            click.secho("获取下载链接失败...", fg="yellow")
-            ctx.exit()
-        if TMP_PATH.exists():
-            shutil.rmtree(TMP_PATH)
-        TMP_PATH.mkdir(parents=True, exist_ok=True)
-        download_file = TMP_PATH / DOWNLOAD_ZIP_FILE_STRING
-        if await AsyncHttpx.download_file(url, download_file, stream=True):
-            click.secho("下载真寻最新版文件完成！", fg="yellow")
-            await cls._unzip_handle(project_name)
+        tree_info = await cls._tree_info(repo_info)
+        key = tree_info and tree_info.sha
+        target = Path() / project_name
+        if key and SourceCache.has(key):
+            click.secho("使用本地缓存的小真寻源码...", fg="yellow")
+            SourceCache.link(key, target, link_mode)
+            click.secho(f"小真寻源码已复制到 {project_name}", fg="yellow")
         else:
-            click.secho("下载真寻最新版文件失败...", fg="red")
-            ctx.exit()
+            workdir = SourceCache.workdir()
+            try:
+                tree = workdir / "source"
+                if not (
+                    stream and await cls._stream_fetch(repo_info, tree)
+                ) and not await cls._download_fetch(repo_info, workdir, tree, key):
+                    return None
+                if not key or (single and not SourceCache.can_share(target, link_mode)):
+                    shutil.move(tree, target)
+                else:
+                    SourceCache.store(key, tree)
+                    SourceCache.link(key, target, link_mode)
+                    click.secho(f"小真寻源码已复制到 {project_name}", fg="yellow")
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        if tree_info:
+            await asyncio.to_thread(UpdateHelp.init_manifest, target, tree_info)
         return "zhenxun_bot"
 
     @classmethod
-    async def _unzip_handle(cls, project_name: str):
-        """解压文件
+    async def download_install(
+        cls,
+        ctx: click.Context,
+        project_name: str,
+        link_mode: LinkMode = "auto",
+        single: bool = True,
+    ) -> str | None:
+        """下载压缩包安装
 
         参数:
             ctx: ctx
+            project_name: 项目名称
+            link_mode: 从缓存复制源码的方式
+            single: 是否只创建一个项目
+        """
+        return await cls.install(ctx, project_name, link_mode=link_mode, single=single)
+
+    @classmethod
+    async def stream_install(
+        cls,
+        ctx: click.Context,
+        project_name: str,
+        link_mode: LinkMode = "auto",
+        single: bool = True,
+    ) -> str | None:
+        """边下载边解压，失败时回退到下载压缩包安装
+
+        参数:
+            ctx: ctx
+            project_name: 项目名称
+            link_mode: 从缓存复制源码的方式
+            single: 是否只创建一个项目
+        """
+        return await cls.install(
+            ctx, project_name, stream=True, link_mode=link_mode, single=single
+        )
+
+    @classmethod
+    async def _stream_fetch(cls, repo_info: RepoInfo, tree: Path) -> bool:
+        """边下载边解压到 tree"""
+        click.secho("开始下载并解压小真寻项目...", fg="yellow")
+        try:
+            urls = await repo_info.get_archive_tgz_download_urls()
+        except Exception as e:
+            click.secho(f"获取下载链接失败: {e}", fg="red")
+            urls = []
+        if urls and await AsyncHttpx.download_extract_tar(urls, tree):
+            click.secho("下载并解压真寻最新版文件完成！", fg="yellow")
+            return True
+        click.secho("边下载边解压失败，改用下载压缩包安装...", fg="yellow")
+        return False
+
+    @classmethod
+    async def _download_fetch(
+        cls,
+        repo_info: RepoInfo,
+        workdir: Path,
+        tree: Path,
+        key: str | None,
+    ) -> bool:
+        """下载压缩包并解压到 tree，压缩包保存在本次下载独立的临时目录中"""
+        click.secho("开始下载小真寻项目...", fg="yellow")
+        try:
+            url = await repo_info.get_archive_download_urls()
+        except Exception as e:
+            click.secho(f"获取下载链接失败: {e}", fg="red")
+            return False
+        if not url:
+            click.secho("获取下载链接失败...", fg="red")
+            return False
+        download_file = workdir / (f"{key}.zip" if key else DOWNLOAD_ZIP_FILE_STRING)
+        if not await AsyncHttpx.download_file(
+            url, download_file, stream=True, concurrency=cls.DOWNLOAD_CONCURRENCY
+        ):
+            click.secho("下载真寻最新版文件失败...", fg="red")
+            return False
+        click.secho("下载真寻最新版文件完成！", fg="yellow")
+        if not zipfile.is_zipfile(download_file):
+            download_file.unlink()
+            click.secho("下载文件校验失败，请重新安装...", fg="red")
+            return False
+        cls._unzip_handle(download_file, workdir / "unzip", tree)
+        return True
+
+    @classmethod
+    def _unzip_handle(cls, download_file: Path, unzip_path: Path, tree: Path):
+        """解压文件，并将压缩包中唯一的顶层文件夹移动到 tree
+
+        参数:
+            download_file: 压缩包
+            unzip_path: 解压目录
+            tree: 源码目录
         """
         click.secho("开始解压下载文件...", fg="yellow")
-        download_file = TMP_PATH / DOWNLOAD_ZIP_FILE_STRING
-        tf = zipfile.ZipFile(download_file)
-        tf.extractall(Path())
-        if tf:
-            tf.close()
+        with zipfile.ZipFile(download_file) as tf:
+            tf.extractall(unzip_path)
         click.secho("解压下载完成！", fg="yellow")
-        if download_file.exists():
-            download_file.unlink()
-        unzip_file = Path() / "zhenxun_bot-main"
-        if unzip_file.exists():
-            unzip_file.rename(project_name)
-        if TMP_PATH.exists():
-            shutil.rmtree(TMP_PATH)
+        download_file.unlink()
+        top_dirs = list(unzip_path.iterdir())
+        (top_dirs[0] if len(top_dirs) == 1 else unzip_path).rename(tree)
@@ -1,4 +1,7 @@
 import asyncio
+import os
+from pathlib import Path
+import time
 
 import click
 from nb_cli.cli import CLI_DEFAULT_STYLE
@@ -7,6 +10,32 @@ from noneprompt import (
     ListPrompt,
 )
 
+from .mirror_utils import MirrorScoreboard
+from .source_cache import remove_project
+
+GIT_REPO_URL = "https://github.com/HibiKier/zhenxun_bot"
+"""小真寻仓库地址"""
+
+GIT_MIRRORS = {
+    GIT_REPO_URL: "github官方源(国外推荐)",
+    f"https://ghproxy.cc/{GIT_REPO_URL}": "ghproxy镜像源(国内推荐)",
+    f"https://gh-proxy.com/{GIT_REPO_URL}": "gh-proxy镜像源(国内备选1)",
+    f"https://github.cherishmoon.fun/{GIT_REPO_URL}": "cherishmoon镜像源(国内备选2)",
+}
+"""git克隆源"""
+
+GIT_PROBE_TIMEOUT = 10
+"""git ls-remote 探测超时时间(秒)"""
+
+GIT_LOW_SPEED_LIMIT = 10 * 1024
+"""克隆速度下限(字节/秒)，持续低于该速度 GIT_LOW_SPEED_TIME 秒时放弃该克隆源"""
+
+GIT_LOW_SPEED_TIME = 30
+"""克隆速度低于下限的最长持续时间(秒)"""
+
+GIT_ENV = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+"""git子进程环境变量，失效的镜像要求认证时直接失败而不是等待输入"""
+
 
 class GitInstallHelp:
     @classmethod
@@ -23,49 +52,206 @@ class GitInstallHelp:
         return bool(stdout)
 
     @classmethod
-    async def __clone_zhenxun(cls, git_url: str, dir_name: str = "zhenxun_bot"):
+    async def __clone_zhenxun(
+        cls,
+        git_url: str,
+        dir_name: str = "zhenxun_bot",
+        *,
+        partial: bool = False,
+        sparse: list[str] | None = None,
+        reference: Path | None = None,
+    ):
         """克隆项目
 
         参数:
             git_url: git仓库地址
             dir_name: 要存放的文件夹名
+            partial: 部分克隆，文件内容在检出时按需下载
+            sparse: 只检出的目录，根目录下的文件总会检出
+            reference: 共享对象的本地仓库
         """
+        args = ["--depth=1", "--single-branch"]
+        if reference:
+            args.append(f"--reference-if-able={reference.absolute()}")
+        if partial:
+            args.append("--filter=blob:none")
+        if sparse:
+            args.append("--sparse")
         return await asyncio.create_subprocess_exec(
             "git",
+            "-c",
+            f"http.lowSpeedLimit={GIT_LOW_SPEED_LIMIT}",
+            "-c",
+            f"http.lowSpeedTime={GIT_LOW_SPEED_TIME}",
             "clone",
-            "--depth=1",
-            "--single-branch",
+            *args,
             git_url,
             dir_name,
+            env=GIT_ENV,
         )
 
     @classmethod
-    async def start_clone(cls, ctx: click.Context, project_name: str):
-        """克隆项目
+    async def _reference_error(cls, reference: Path) -> str | None:
+        """检查共享对象的本地仓库是否可用(普通或裸仓库，且不能是浅克隆)
+
+        参数:
+            reference: 本地仓库
+
+        返回:
+            str | None: 不可用的原因，可用时为 None
+        """
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "-C",
+            str(reference.absolute()),
+            "rev-parse",
+            "--is-shallow-repository",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=GIT_ENV,
+        )
+        stdout, _ = await process.communicate()
+        if process.returncode != 0:
+            return "不是git仓库"
+        if stdout.decode().strip() == "true":
+            # git 不会把浅克隆的仓库添加为 alternates，共享不到任何对象
+            return "是浅克隆仓库"
+        return None
+
+    @classmethod
+    async def _probe_mirror(cls, git_url: str) -> float:
+        """使用 git ls-remote 探测克隆源
+
+        返回:
+            float: 延迟(毫秒)
+        """
+        begin_time = time.time()
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "ls-remote",
+            "--heads",
+            git_url,
+            "main",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=GIT_ENV,
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), GIT_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0 or not stdout:
+            raise RuntimeError(f"git ls-remote 退出码: {process.returncode}")
+        return (time.time() - begin_time) * 1000
+
+    @classmethod
+    async def get_fastest_mirrors(
+        cls, url_list: list[str], *, refresh: bool = False
+    ) -> list[str]:
+        """按镜像评分排序克隆源，评分缺失或过期时同时探测全部克隆源
+
+        参数:
+            url_list: 克隆源
+            refresh: 忽略缓存的评分强制探测
+        """
+        if not refresh and (ranked := MirrorScoreboard.rank(url_list)):
+            return ranked
+        click.secho("正在测试克隆源速度...", fg="yellow")
+        results = await asyncio.gather(
+            *(cls._probe_mirror(url) for url in url_list),
+            return_exceptions=True,
+        )
+        for url, result in zip(url_list, results):
+            if isinstance(result, BaseException):
+                MirrorScoreboard.record_failure(url, probe=True)
+            else:
+                MirrorScoreboard.record_latency(url, result)
+        MirrorScoreboard.save()
+        return MirrorScoreboard.rank(url_list) or []
+
+    @classmethod
+    async def start_clone(
+        cls,
+        ctx: click.Context,
+        project_name: str,
+        *,
+        partial: bool = False,
+        sparse: list[str] | None = None,
+        reference: Path | None = None,
+        mirror: str | None = None,
+    ):
+        """克隆项目，克隆失败或速度过低时依次尝试下一个克隆源
 
         参数:
             ctx: ctx
             project_name: 项目文件夹名称
+            partial: 部分克隆(--filter=blob:none)
+            sparse: 只检出的目录(sparse-checkout)
+            reference: 共享对象的本地仓库(--reference)，可为裸仓库，不能是浅克隆
+            mirror: 克隆源地址，为 auto 时自动选择，为 None 时询问
         """
-        git_url = await ListPrompt(
-            "要使用的克隆源?",
-            [
-                Choice(
-                    "github官方源(国外推荐)",
-                    "https://github.com/HibiKier/zhenxun_bot",
-                ),
-                Choice(
-                    "cherishmoon镜像源(国内推荐)",
-                    "https://github.cherishmoon.fun/https://github.com/HibiKier/zhenxun_bot",
-                ),
-                Choice(
-                    "ghproxy镜像源(国内备选1)",
-                    "https://ghproxy.com/https://github.com/HibiKier/zhenxun_bot",
-                ),
-            ],
-            default_select=1,
-        ).prompt_async(style=CLI_DEFAULT_STYLE)
-        click.secho(f"在 {project_name} 文件夹克隆源码...", fg="yellow")
-        clone_result = await cls.__clone_zhenxun(git_url.data, project_name)
-        await clone_result.wait()
+        if reference and (error := await cls._reference_error(reference)):
+            click.secho(f"{reference} {error}，将不共享对象", fg="yellow")
+            reference = None
+        if mirror is None:
+            choice = await ListPrompt(
+                "要使用的克隆源?",
+                [
+                    Choice("自动选择最快的克隆源(推荐)", "auto"),
+                    *(Choice(name, url) for url, name in GIT_MIRRORS.items()),
+                ],
+                default_select=0,
+            ).prompt_async(style=CLI_DEFAULT_STYLE)
+            mirror = choice.data
+        if mirror == "auto":
+            git_urls = await cls.get_fastest_mirrors(list(GIT_MIRRORS))
+            if not git_urls:
+                click.secho("没有可用的克隆源，请检查网络", fg="red")
+                ctx.exit(1)
+        else:
+            git_urls = [mirror]
+        project_path = Path() / project_name
+        for git_url in git_urls:
+            click.secho(f"在 {project_name} 文件夹克隆源码({git_url})...", fg="yellow")
+            begin_time = time.time()
+            clone_result = await cls.__clone_zhenxun(
+                git_url,
+                project_name,
+                partial=partial,
+                sparse=sparse,
+                reference=reference,
+            )
+            if await clone_result.wait() == 0:
+                MirrorScoreboard.record_throughput(
+                    git_url,
+                    sum(
+                        f.stat().st_size
+                        for f in (project_path / ".git").rglob("*")
+                        if f.is_file()
+                    ),
+                    time.time() - begin_time,
+                )
+                break
+            MirrorScoreboard.record_failure(git_url)
+            if project_path.exists():
+                remove_project(project_path)
+            click.secho(f"克隆失败，退出码: {clone_result.returncode}", fg="yellow")
+        else:
+            MirrorScoreboard.save()
+            click.secho(f"{project_name} 克隆失败！", fg="red")
+            ctx.exit(1)
+        MirrorScoreboard.save()
+        if sparse:
+            sparse_result = await asyncio.create_subprocess_exec(
+                "git", "-C", project_name, "sparse-checkout", "set", *sparse
+            )
+            if await sparse_result.wait() != 0:
+                click.secho(
+                    f"{project_name} 设置只检出目录失败，"
+                    f"退出码: {sparse_result.returncode}",
+                    fg="red",
+                )
+                ctx.exit(1)
         click.secho(f"{project_name} 克隆完成！", fg="yellow")
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any
+
+import httpx
+
+from ...utils.const import API_CACHE_PATH
+from ...utils.http_utils import AsyncHttpx
+from .const import API_CACHE_MAX_ENTRY_SIZE, API_CACHE_MAX_SIZE, CACHED_API_TTL
+
+
+class ApiCache:
+    """仓库 api 响应的磁盘缓存
+
+    按请求地址(含 owner/repo/branch)保存响应与 ETag/Last-Modified，
+    TTL 内直接使用缓存，过期后带 If-None-Match 重新验证，304 时沿用缓存。
+    """
+
+    @classmethod
+    def _path(cls, url: str):
+        return API_CACHE_PATH / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.json"
+
+    @classmethod
+    def _load(cls, url: str) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(cls._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    @classmethod
+    def _save(cls, url: str, entry: dict[str, Any]):
+        path = cls._path(url)
+        try:
+            API_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换，避免多个实例同时读写时读到半个文件
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            print(f"保存api缓存失败，错误：{e}")
+            return
+        cls.prune()
+
+    @classmethod
+    def prune(cls, max_size: int = API_CACHE_MAX_SIZE):
+        """按最近使用时间淘汰缓存，直到总大小不超过上限
+
+        参数:
+            max_size: 缓存大小上限(字节)
+        """
+        files = []
+        for file in API_CACHE_PATH.glob("*.json"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files):
+            if total <= max_size:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
+
+    @classmethod
+    async def get_json(
+        cls, url: str, *, mirrors: list[str] | None = None, refresh: bool = False
+    ) -> Any:
+        """获取 api 响应的 json
+
+        参数:
+            url: api 地址，同时作为缓存键
+            mirrors: 竞速请求的镜像地址(含 url)，为空时只请求 url
+            refresh: 忽略缓存重新获取
+
+        返回:
+            Any: 响应 json
+        """
+        entry = None if refresh else cls._load(url)
+        if entry and time.time() - entry["fetched_at"] < CACHED_API_TTL:
+            return entry["body"]
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            res = await AsyncHttpx.get(url=mirrors or url, headers=headers)
+        except httpx.HTTPError as e:
+            if not entry:
+                raise
+            # 离线或超时时退回到过期的缓存
+            print(f"获取 {url} 失败, 错误: {e!r}, 使用本地缓存")
+            return entry["body"]
+        if res.status_code == 304 and entry:
+            entry["fetched_at"] = time.time()
+            cls._save(url, entry)
+            return entry["body"]
+        if res.status_code != 200:
+            if entry:
+                # 触发限流等错误时退回到过期的缓存
+                print(f"获取 {url} 失败, code: {res.status_code}, 使用本地缓存")
+                return entry["body"]
+            raise ValueError(f"下载错误, code: {res.status_code}")
+        body = res.json()
+        if len(res.content) <= API_CACHE_MAX_ENTRY_SIZE:
+            cls._save(
+                url,
+                {
+                    "url": url,
+                    "etag": res.headers.get("ETag"),
+                    "last_modified": res.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                    "body": body,
+                },
+            )
+        return body
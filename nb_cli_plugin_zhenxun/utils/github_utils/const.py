@@ -18,12 +18,23 @@ GIT_API_TREES_FORMAT = (
 CACHED_API_TTL = 300
 """缓存api ttl"""
 
+API_CACHE_MAX_ENTRY_SIZE = 32 * 1024 * 1024
+"""单个api响应写入磁盘缓存的大小上限"""
+
+API_CACHE_MAX_SIZE = 128 * 1024 * 1024
+"""api磁盘缓存的总大小上限，超出时淘汰最久未使用的响应"""
+
 RAW_CONTENT_FORMAT = "https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
 """raw content格式"""
 
 ARCHIVE_URL_FORMAT = "https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"
 """archive url格式"""
 
+ARCHIVE_TGZ_URL_FORMAT = (
+    "https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.tar.gz"
+)
+"""archive tar.gz url格式"""
+
 RELEASE_ASSETS_FORMAT = (
     "https://github.com/{owner}/{repo}/releases/download/{version}/{filename}"
 )
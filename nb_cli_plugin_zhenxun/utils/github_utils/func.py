@@ -1,6 +1,8 @@
 from ...utils.http_utils import AsyncHttpx
 from .const import (
+    ARCHIVE_TGZ_URL_FORMAT,
     ARCHIVE_URL_FORMAT,
+    GIT_API_TREES_FORMAT,
     RAW_CONTENT_FORMAT,
     RELEASE_ASSETS_FORMAT,
     RELEASE_SOURCE_FORMAT,
@@ -37,6 +39,17 @@ async def get_fastest_archive_formats() -> list[str]:
     return await __get_fastest_formats(formats)
 
 
+async def get_fastest_archive_tgz_formats() -> list[str]:
+    """获取最快的tar.gz归档下载地址格式"""
+    formats: dict[str, str] = {
+        "https://github.com/": ARCHIVE_TGZ_URL_FORMAT,
+        "https://ghproxy.cc/": f"https://ghproxy.cc/{ARCHIVE_TGZ_URL_FORMAT}",
+        "https://mirror.ghproxy.com/": f"https://mirror.ghproxy.com/{ARCHIVE_TGZ_URL_FORMAT}",
+        "https://gh-proxy.com/": f"https://gh-proxy.com/{ARCHIVE_TGZ_URL_FORMAT}",
+    }
+    return await __get_fastest_formats(formats)
+
+
 async def get_fastest_release_formats() -> list[str]:
     """获取最快的发行版资源下载地址格式"""
     formats: dict[str, str] = {
@@ -55,3 +68,14 @@ async def get_fastest_release_source_formats() -> list[str]:
         "https://p.102333.xyz/": f"https://p.102333.xyz/{RELEASE_SOURCE_FORMAT}",
     }
     return await __get_fastest_formats(formats)
+
+
+async def get_fastest_api_trees_formats() -> list[str]:
+    """获取最快的仓库树api地址格式"""
+    formats: dict[str, str] = {
+        "https://api.github.com/": GIT_API_TREES_FORMAT,
+        "https://ghproxy.cc/": f"https://ghproxy.cc/{GIT_API_TREES_FORMAT}",
+        "https://mirror.ghproxy.com/": f"https://mirror.ghproxy.com/{GIT_API_TREES_FORMAT}",
+        "https://gh-proxy.com/": f"https://gh-proxy.com/{GIT_API_TREES_FORMAT}",
+    }
+    return await __get_fastest_formats(formats)
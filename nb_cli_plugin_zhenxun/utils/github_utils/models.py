@@ -1,13 +1,20 @@
-from typing import Protocol
+from bisect import bisect_left
+from collections.abc import Iterable
+from pathlib import Path
+import sys
+from typing import Any, Protocol
 
 from aiocache import cached
 from pydantic import BaseModel
 from strenum import StrEnum
 
-from ...utils.http_utils import AsyncHttpx
+from ...utils.http_utils import AsyncHttpx, DownloadTask
+from .cache import ApiCache
 from .const import CACHED_API_TTL, GIT_API_TREES_FORMAT, JSD_PACKAGE_API_FORMAT
 from .func import (
+    get_fastest_api_trees_formats,
     get_fastest_archive_formats,
+    get_fastest_archive_tgz_formats,
     get_fastest_raw_formats,
     get_fastest_release_source_formats,
 )
@@ -42,6 +49,49 @@ class RepoInfo(BaseModel):
         url_formats = await get_fastest_archive_formats()
         return [url_format.format(**self.dict()) for url_format in url_formats]
 
+    async def get_archive_tgz_download_urls(self) -> list[str]:
+        url_formats = await get_fastest_archive_tgz_formats()
+        return [url_format.format(**self.dict()) for url_format in url_formats]
+
+    async def fetch_paths(
+        self, paths: list[str], dest: Path, *, concurrency: int = 8
+    ) -> dict[str, bool]:
+        """批量下载仓库文件到目标目录
+
+        只对镜像排序一次，每个文件按排序依次尝试各镜像
+
+        参数:
+            paths: 仓库内的文件路径，可由 RepoAPI.get_files 获取
+            dest: 目标目录，文件保存到 dest/path
+            concurrency: 同时下载的文件数
+
+        返回:
+            dict[str, bool]: 各文件是否下载成功
+        """
+        url_formats = await get_fastest_raw_formats()
+        tasks = [
+            DownloadTask(
+                [
+                    url_format.format(**self.dict(), path=path)
+                    for url_format in url_formats
+                ],
+                dest / path,
+                show_name=path,
+            )
+            for path in paths
+        ]
+        results = dict(
+            zip(
+                paths,
+                await AsyncHttpx.download_files(tasks, concurrency=concurrency),
+            )
+        )
+        failed = [path for path, ok in results.items() if not ok]
+        print(f"下载完成.. 成功 {len(paths) - len(failed)} 个, 失败 {len(failed)} 个")
+        for path in failed:
+            print(f"下载 {path} 失败")
+        return results
+
     async def get_release_source_download_urls_tgz(self, version: str) -> list[str]:
         url_formats = await get_fastest_release_source_formats()
         return [
@@ -60,9 +110,11 @@ class RepoInfo(BaseModel):
 class APIStrategy(Protocol):
     """API策略"""
 
-    body: BaseModel
+    body: "FileInfo | TreeInfo"
 
-    async def parse_repo_info(self, repo_info: RepoInfo) -> BaseModel: ...
+    async def parse_repo_info(
+        self, repo_info: RepoInfo, refresh: bool = False
+    ) -> "FileInfo | TreeInfo": ...
 
     def get_files(self, module_path: str, is_dir: bool) -> list[str]: ...
 
@@ -73,14 +125,51 @@ class RepoAPI:
     def __init__(self, strategy: APIStrategy):
         self.strategy = strategy
 
-    async def parse_repo_info(self, repo_info: RepoInfo):
-        body = await self.strategy.parse_repo_info(repo_info)
+    async def parse_repo_info(self, repo_info: RepoInfo, refresh: bool = False):
+        body = await self.strategy.parse_repo_info(repo_info, refresh)
         self.strategy.body = body
 
     def get_files(self, module_path: str, is_dir: bool) -> list[str]:
         return self.strategy.get_files(module_path, is_dir)
 
 
+class PathIndex:
+    """仓库文件路径索引
+
+    文件路径排序后保存，目录列举为前缀区间查找，单文件为哈希查找
+    """
+
+    __slots__ = ("_dirs", "_file_set", "_files")
+
+    def __init__(self, files: Iterable[str], dirs: Iterable[str] = ()):
+        self._files = sorted(files)
+        self._file_set = frozenset(self._files)
+        self._dirs = frozenset(dirs)
+
+    def has_file(self, path: str) -> bool:
+        return path in self._file_set
+
+    def has_dir(self, path: str) -> bool:
+        return not path or path in self._dirs
+
+    def list_dir(self, dir_path: str) -> list[str]:
+        """递归列出目录下的全部文件路径
+
+        参数:
+            dir_path: 目录路径，为空时列出全部文件
+
+        返回:
+            list[str]: 文件路径
+        """
+        if not dir_path:
+            return list(self._files)
+        # 以 "dir/" 开头的路径在排序后连续，且都小于 "dir0"("0" 紧随 "/")
+        prefix = f"{dir_path}/"
+        start = bisect_left(self._files, prefix)
+        end = bisect_left(self._files, f"{dir_path}0", lo=start)
+        return self._files[start:end]
+
+
 class FileType(StrEnum):
     """文件类型"""
 
@@ -89,12 +178,54 @@ class FileType(StrEnum):
     PACKAGE = "gh"
 
 
-class FileInfo(BaseModel):
-    """文件信息"""
+class FileInfo:
+    """文件信息
+
+    只保留类型、名称与子文件，不做逐项校验
+    """
 
-    type: FileType
-    name: str
-    files: list["FileInfo"] = []
+    __slots__ = ("_path_index", "files", "name", "type")
+
+    def __init__(
+        self, type: FileType, name: str, files: list["FileInfo"] | None = None
+    ):
+        self.type = type
+        self.name = name
+        self.files = files or []
+        self._path_index: PathIndex | None = None
+
+    @classmethod
+    def parse(cls, data: dict[str, Any]) -> "FileInfo":
+        """由 api 响应构建，文件名驻留以共享 __init__.py 等重复名称
+
+        参数:
+            data: api 响应
+
+        返回:
+            FileInfo: 文件信息
+        """
+        return cls(
+            FileType(data["type"]),
+            sys.intern(data["name"]),
+            [cls.parse(file) for file in data.get("files", ())],
+        )
+
+    @property
+    def path_index(self) -> PathIndex:
+        """文件路径索引，首次访问时构建"""
+        if self._path_index is None:
+            files: list[str] = []
+            dirs: list[str] = []
+            stack = [(f, f.name) for f in self.files]
+            while stack:
+                file, path = stack.pop()
+                if file.type == FileType.FILE:
+                    files.append(path)
+                elif file.type == FileType.DIR:
+                    dirs.append(path)
+                    stack.extend((f, f"{path}/{f.name}") for f in file.files)
+            self._path_index = PathIndex(files, dirs)
+        return self._path_index
 
 
 class JsdelivrStrategy:
@@ -104,54 +235,26 @@ class JsdelivrStrategy:
 
     def get_file_paths(self, module_path: str, is_dir: bool = True) -> list[str]:
         """获取文件路径"""
-        paths = module_path.split("/")
-        filename = "" if is_dir and module_path else paths[-1]
-        paths = paths if is_dir and module_path else paths[:-1]
-        cur_file = self.body
-        for path in paths:  # 导航到正确的目录
-            cur_file = next(
-                (
-                    f
-                    for f in cur_file.files
-                    if f.type == FileType.DIR and f.name == path
-                ),
-                None,
-            )
-            if not cur_file:
-                raise ValueError(f"模块路径{module_path}不存在")
-
-        def collect_files(file: FileInfo, current_path: str, filename: str):
-            """收集文件"""
-            if file.type == FileType.FILE and (not filename or file.name == filename):
-                return [f"{current_path}/{file.name}"]
-            elif file.type == FileType.DIR and file.files:
-                return [
-                    path
-                    for f in file.files
-                    for path in collect_files(
-                        f,
-                        (
-                            f"{current_path}/{f.name}"
-                            if f.type == FileType.DIR
-                            else current_path
-                        ),
-                        filename,
-                    )
-                ]
-            return []
-
-        files = collect_files(cur_file, "/".join(paths), filename)
-        return files if module_path else [f[1:] for f in files]
+        index = self.body.path_index
+        dir_path = module_path if is_dir else module_path.rpartition("/")[0]
+        if not index.has_dir(dir_path):
+            raise ValueError(f"模块路径{module_path}不存在")
+        if is_dir:
+            return index.list_dir(module_path)
+        return [module_path] if index.has_file(module_path) else []
 
     @classmethod
     @cached(ttl=CACHED_API_TTL)
-    async def parse_repo_info(cls, repo_info: RepoInfo) -> "FileInfo":
+    async def parse_repo_info(
+        cls, repo_info: RepoInfo, refresh: bool = False
+    ) -> "FileInfo":
         """解析仓库信息"""
 
         """获取插件包信息
 
         参数:
             repo_info: 仓库信息
+            refresh: 忽略磁盘缓存重新获取
 
         返回:
             FileInfo: 插件包信息
@@ -159,10 +262,7 @@ class JsdelivrStrategy:
         jsd_package_url: str = JSD_PACKAGE_API_FORMAT.format(
             owner=repo_info.owner, repo=repo_info.repo, branch=repo_info.branch
         )
-        res = await AsyncHttpx.get(url=jsd_package_url)
-        if res.status_code != 200:
-            raise ValueError(f"下载错误, code: {res.status_code}")
-        return FileInfo(**res.json())
+        return FileInfo.parse(await ApiCache.get_json(jsd_package_url, refresh=refresh))
 
     def get_files(self, module_path: str, is_dir: bool = True) -> list[str]:
         """获取文件路径"""
@@ -174,25 +274,63 @@ class TreeType(StrEnum):
 
     FILE = "blob"
     DIR = "tree"
+    SUBMODULE = "commit"
 
 
-class Tree(BaseModel):
+class Tree:
     """树"""
 
-    path: str
-    mode: str
-    type: TreeType
-    sha: str
-    size: int | None
-    url: str
+    __slots__ = ("path", "sha", "size", "type")
 
+    def __init__(self, path: str, type: TreeType, sha: str, size: int | None = None):
+        self.path = path
+        self.type = type
+        self.sha = sha
+        self.size = size
 
-class TreeInfo(BaseModel):
-    """树信息"""
 
-    sha: str
-    url: str
-    tree: list[Tree]
+class TreeInfo:
+    """树信息
+
+    只保留 path/type/sha/size，不做逐项校验
+    """
+
+    __slots__ = ("_path_index", "sha", "tree")
+
+    def __init__(self, sha: str, tree: list[Tree]):
+        self.sha = sha
+        self.tree = tree
+        self._path_index: PathIndex | None = None
+
+    @classmethod
+    def parse(cls, data: dict[str, Any]) -> "TreeInfo":
+        """由 api 响应构建
+
+        参数:
+            data: api 响应
+
+        返回:
+            TreeInfo: 树信息
+        """
+        return cls(
+            data["sha"],
+            [
+                Tree(
+                    item["path"], TreeType(item["type"]), item["sha"], item.get("size")
+                )
+                for item in data["tree"]
+            ],
+        )
+
+    @property
+    def path_index(self) -> PathIndex:
+        """文件路径索引，首次访问时构建"""
+        if self._path_index is None:
+            self._path_index = PathIndex(
+                (file.path for file in self.tree if file.type == TreeType.FILE),
+                (file.path for file in self.tree if file.type == TreeType.DIR),
+            )
+        return self._path_index
 
 
 class GitHubStrategy:
@@ -202,22 +340,21 @@ class GitHubStrategy:
 
     def export_files(self, module_path: str, is_dir: bool) -> list[str]:
         """导出文件路径"""
-        tree_info = self.body
-        return [
-            file.path
-            for file in tree_info.tree
-            if file.type == TreeType.FILE
-            and file.path.startswith(module_path)
-            and (not is_dir or file.path[len(module_path)] == "/" or not module_path)
-        ]
+        index = self.body.path_index
+        if is_dir:
+            return index.list_dir(module_path)
+        return [module_path] if index.has_file(module_path) else []
 
     @classmethod
     @cached(ttl=CACHED_API_TTL)
-    async def parse_repo_info(cls, repo_info: RepoInfo) -> "TreeInfo":
+    async def parse_repo_info(
+        cls, repo_info: RepoInfo, refresh: bool = False
+    ) -> "TreeInfo":
         """获取仓库树
 
         参数:
             repo_info: 仓库信息
+            refresh: 忽略磁盘缓存重新获取
 
         返回:
             TreesInfo: 仓库树信息
@@ -225,10 +362,17 @@ class GitHubStrategy:
         git_tree_url: str = GIT_API_TREES_FORMAT.format(
             owner=repo_info.owner, repo=repo_info.repo, branch=repo_info.branch
         )
-        res = await AsyncHttpx.get(url=git_tree_url)
-        if res.status_code != 200:
-            raise ValueError(f"下载错误, code: {res.status_code}")
-        return TreeInfo(**res.json())
+        try:
+            mirrors = [
+                url_format.format(**repo_info.dict())
+                for url_format in await get_fastest_api_trees_formats()
+            ]
+        except Exception:
+            # 无法探测镜像时直接请求 api，请求失败时仍可退回到本地缓存
+            mirrors = None
+        return TreeInfo.parse(
+            await ApiCache.get_json(git_tree_url, mirrors=mirrors, refresh=refresh)
+        )
 
     def get_files(self, module_path: str, is_dir: bool = True) -> list[str]:
         """获取文件路径"""
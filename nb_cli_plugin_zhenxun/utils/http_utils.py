@@ -1,17 +1,314 @@
 import asyncio
 from asyncio.exceptions import TimeoutError
-from pathlib import Path
+from dataclasses import asdict, dataclass, field
+import hashlib
+from io import BufferedIOBase, RawIOBase
+import json
+from pathlib import Path, PurePosixPath
+import queue
+import shutil
+import tarfile
 import time
 from typing import Any
+from weakref import WeakKeyDictionary
 
 import httpx
-from httpx import ConnectTimeout, HTTPStatusError, Response
+from httpx import HTTPStatusError, Response
 import rich
 
+from .mirror_utils import MirrorScoreboard
+
 # from .browser import get_browser
 
+ClientKey = tuple[bool, tuple[tuple[str, str], ...] | None, bool]
+"""连接池键: (verify, proxy, http2)"""
+
+ClientPool = dict[ClientKey, httpx.AsyncClient]
+
+
+@dataclass
+class DownloadState:
+    """断点续传状态，与 .part 临时文件一同保存在下载目录"""
+
+    url: str = ""
+    size: int | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    ranges: list[list[int]] = field(default_factory=list)
+    """已完成的字节区间 [start, end)"""
+    state_path: Path | None = field(default=None, repr=False, compare=False)
+    _saved_at: float = field(default=0, repr=False, compare=False)
+
+    SAVE_INTERVAL = 1
+    """下载过程中保存状态的最小间隔(秒)"""
+
+    @classmethod
+    def load(cls, state_path: Path) -> "DownloadState":
+        """读取续传状态，不存在或已损坏时返回空状态"""
+        try:
+            data = json.loads(state_path.read_text(encoding="utf-8"))
+            return cls(**data, state_path=state_path)
+        except (OSError, ValueError, TypeError):
+            return cls(state_path=state_path)
+
+    @property
+    def validator(self) -> str | None:
+        """用于 If-Range 的校验值"""
+        return self.etag or self.last_modified
+
+    def reset(
+        self,
+        *,
+        url: str,
+        size: int | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ranges = []
+
+    def add_range(self, start: int, end: int):
+        """记录已完成的区间并合并相邻区间"""
+        if start >= end:
+            return
+        merged: list[list[int]] = []
+        for r_start, r_end in sorted([*self.ranges, [start, end]]):
+            if merged and r_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], r_end)
+            else:
+                merged.append([r_start, r_end])
+        self.ranges = merged
+
+    def prefix_size(self) -> int:
+        """从文件开头连续完成的字节数"""
+        return self.ranges[0][1] if self.ranges and self.ranges[0][0] == 0 else 0
+
+    def completed_size(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    def missing(self) -> list[tuple[int, int]]:
+        """未完成的区间"""
+        gaps: list[tuple[int, int]] = []
+        offset = 0
+        for start, end in self.ranges:
+            if start > offset:
+                gaps.append((offset, start))
+            offset = max(offset, end)
+        if self.size is not None and offset < self.size:
+            gaps.append((offset, self.size))
+        return gaps
+
+    def save(self, *files: BufferedIOBase):
+        """保存状态，记录的区间可能由多个文件句柄写入，需全部传入以先落盘数据"""
+        for wf in files:
+            wf.flush()
+        self._saved_at = time.monotonic()
+        if self.state_path is None:
+            return
+        data = {
+            k: v
+            for k, v in asdict(self).items()
+            if k not in {"state_path", "_saved_at"}
+        }
+        self.state_path.write_text(json.dumps(data), encoding="utf-8")
+
+    def save_throttled(self, *files: BufferedIOBase):
+        if time.monotonic() - self._saved_at >= self.SAVE_INTERVAL:
+            self.save(*files)
+
+    def discard(self, part_path: Path | None = None):
+        """删除续传状态，并可选删除临时文件"""
+        self.reset(url=self.url)
+        if self.state_path is not None:
+            self.state_path.unlink(missing_ok=True)
+        if part_path is not None:
+            part_path.unlink(missing_ok=True)
+
+
+class ChunkQueueReader(RawIOBase):
+    """由异步下载写入、在线程中同步读取的只读流"""
+
+    def __init__(self, maxsize: int = 64):
+        self.queue: queue.Queue[bytes | None] = queue.Queue(maxsize)
+        self.buffer = memoryview(b"")
+        self.eof = False
+        self.aborted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self.buffer and not self.eof:
+            if self.aborted:
+                raise OSError("下载已中断")
+            try:
+                chunk = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                self.eof = True
+            else:
+                self.buffer = memoryview(chunk)
+        size = min(len(b), len(self.buffer))
+        b[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+    async def put(self, chunk: bytes | None, consumer: asyncio.Task):
+        """写入数据块，None 表示结束；读取方已退出时不再阻塞"""
+        while not consumer.done():
+            try:
+                self.queue.put_nowait(chunk)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.01)
+        consumer.result()
+
+    def abort(self):
+        self.aborted = True
+
+
+@dataclass
+class DownloadTask:
+    """批量下载任务"""
+
+    url: str | list[str]
+    """url，为列表时依次作为备用镜像"""
+    save_path: Path
+    """保存路径"""
+    show_name: str | None = None
+    """下载时展示的昵称"""
+
 
 class AsyncHttpx:
+    max_connections: int = 20
+    """单个连接池最大连接数"""
+    max_keepalive_connections: int = 10
+    """单个连接池最大保活连接数"""
+    keepalive_expiry: float = 30
+    """保活连接过期时间(秒)"""
+    connect_timeout: float = 10
+    """默认的单次连接超时时间(秒)"""
+    min_segment_size: int = 1024 * 1024
+    """分段下载时单个分段的最小大小"""
+
+    _pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, ClientPool]" = (
+        WeakKeyDictionary()
+    )
+    """按事件循环隔离的连接池"""
+
+    @classmethod
+    def configure_pool(
+        cls,
+        *,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+    ):
+        """配置连接池，仅对之后新建的 client 生效
+
+        参数:
+            max_connections: 最大连接数
+            max_keepalive_connections: 最大保活连接数
+            keepalive_expiry: 保活连接过期时间(秒)
+        """
+        if max_connections is not None:
+            cls.max_connections = max_connections
+        if max_keepalive_connections is not None:
+            cls.max_keepalive_connections = max_keepalive_connections
+        if keepalive_expiry is not None:
+            cls.keepalive_expiry = keepalive_expiry
+
+    @classmethod
+    def get_client(
+        cls,
+        *,
+        verify: bool = True,
+        proxy: dict[str, str] | None = None,
+        http2: bool = False,
+    ) -> httpx.AsyncClient:
+        """获取共享的 client，同一事件循环内按 (verify, proxy, http2) 复用连接
+
+        参数:
+            verify: verify
+            proxy: 指定代理
+            http2: 是否启用 http2
+
+        返回:
+            httpx.AsyncClient: client
+        """
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        proxy_key = tuple(sorted(proxy.items())) if proxy else None
+        key: ClientKey = (verify, proxy_key, http2)
+        pool = cls._pools.setdefault(asyncio.get_running_loop(), {})
+        client = pool.get(key)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=cls.max_connections,
+                max_keepalive_connections=cls.max_keepalive_connections,
+                keepalive_expiry=cls.keepalive_expiry,
+            )
+            mounts = (
+                {
+                    pattern: httpx.AsyncHTTPTransport(
+                        proxy=proxy_url, verify=verify, http2=http2, limits=limits
+                    )
+                    for pattern, proxy_url in proxy.items()
+                }
+                if proxy
+                else None
+            )
+            client = httpx.AsyncClient(
+                verify=verify, http2=http2, limits=limits, mounts=mounts
+            )
+            pool[key] = client
+        return client
+
+    @staticmethod
+    async def _close_clients(clients: list[httpx.AsyncClient]):
+        await asyncio.gather(
+            *(client.aclose() for client in clients),
+            return_exceptions=True,
+        )
+
+    @classmethod
+    async def aclose(cls):
+        """关闭当前事件循环中的所有 client"""
+        pool = cls._pools.pop(asyncio.get_running_loop(), {})
+        await cls._close_clients(list(pool.values()))
+
+    @classmethod
+    def shutdown(cls):
+        """关闭所有 client，供命令结束时在同步上下文中调用"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for loop, pool in list(cls._pools.items()):
+            coro = cls._close_clients(list(pool.values()))
+            if loop.is_closed():
+                coro.close()
+            elif loop is running_loop:
+                loop.create_task(coro)
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(coro, loop).result()
+            else:
+                loop.run_until_complete(coro)
+        cls._pools.clear()
+
+    @classmethod
+    def _timeout(cls, timeout: float, connect_timeout: float | None) -> httpx.Timeout:
+        """单次请求的超时预算，连接阶段使用更短的超时"""
+        connect = cls.connect_timeout if connect_timeout is None else connect_timeout
+        return httpx.Timeout(timeout, connect=min(connect, timeout))
+
     @classmethod
     async def get(
         cls,
@@ -24,12 +321,14 @@ class AsyncHttpx:
         use_proxy: bool = True,
         proxy: dict[str, str] | None = None,
         timeout: int = 30,
+        connect_timeout: float | None = None,
+        race_delay: float | None = 0.5,
         **kwargs,
     ) -> Response:
         """Get
 
         参数:
-            url: url
+            url: url，为列表时作为备用镜像
             params: params
             headers: 请求头
             cookies: cookies
@@ -37,19 +336,27 @@ class AsyncHttpx:
             use_proxy: 使用默认代理
             proxy: 指定代理
             timeout: 超时时间
+            connect_timeout: 连接超时时间，默认为 AsyncHttpx.connect_timeout
+            race_delay: 多个url时竞速的错开间隔(秒)，为 None 时依次尝试
         """
         urls = [url] if isinstance(url, str) else url
-        return await cls._get_first_successful(
-            urls,
-            params=params,
-            headers=headers,
-            cookies=cookies,
-            verify=verify,
-            use_proxy=use_proxy,
-            proxy=proxy,
-            timeout=timeout,
+        request_kwargs = {
+            "params": params,
+            "headers": headers,
+            "cookies": cookies,
+            "verify": verify,
+            "use_proxy": use_proxy,
+            "proxy": proxy,
+            "timeout": timeout,
+            "connect_timeout": connect_timeout,
             **kwargs,
-        )
+        }
+        if race_delay is not None and len(urls) > 1:
+            _, response = await cls._race_first_successful(
+                urls, race_delay=race_delay, **request_kwargs
+            )
+            return response
+        return await cls._get_first_successful(urls, **request_kwargs)
 
     @classmethod
     async def _get_first_successful(
@@ -63,15 +370,107 @@ class AsyncHttpx:
                 return await cls._get_single(url, **kwargs)
             except Exception as e:
                 last_exception = e
+                MirrorScoreboard.record_failure(url)
                 if url != urls[-1]:
                     print(f"获取 {url} 失败, 尝试下一个")
         raise last_exception or Exception("All URLs failed")
 
+    @classmethod
+    async def _race_first_successful(
+        cls,
+        urls: list[str],
+        *,
+        race_delay: float,
+        **kwargs,
+    ) -> tuple[str, Response]:
+        """竞速获取，按顺序错开启动请求，取最先成功的响应并取消其余请求
+
+        前一个请求在 race_delay 内未收到响应头或已失败时，启动下一个请求。
+        错误状态码(4xx/5xx)的响应视为失败，全部失败时返回最后一个错误响应。
+
+        返回:
+            tuple[str, Response]: (响应对应的地址, 响应)
+        """
+        tasks: dict[asyncio.Task[Response], tuple[str, float]] = {}
+        pending: set[asyncio.Task[Response]] = set()
+        last_exception: BaseException | None = None
+        last_response: tuple[str, Response] | None = None
+        next_index = 0
+        try:
+            while next_index < len(urls) or pending:
+                if next_index < len(urls):
+                    url = urls[next_index]
+                    next_index += 1
+                    task = asyncio.create_task(
+                        cls._get_single(url, stream=True, **kwargs)
+                    )
+                    tasks[task] = (url, time.time())
+                    pending.add(task)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=race_delay if next_index < len(urls) else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    url, begin_time = tasks[task]
+                    try:
+                        response = task.result()
+                        latency = (time.time() - begin_time) * 1000
+                        await response.aread()
+                    except Exception as e:
+                        last_exception = e
+                        MirrorScoreboard.record_failure(url)
+                        print(f"获取 {url} 失败, 尝试下一个")
+                        continue
+                    if response.is_error:
+                        # 镜像返回错误页时继续等待其他请求
+                        last_response = (url, response)
+                        MirrorScoreboard.record_failure(url)
+                        print(
+                            f"获取 {url} 失败(状态码: {response.status_code}), "
+                            "尝试下一个"
+                        )
+                        continue
+                    MirrorScoreboard.record_latency(url, latency)
+                    if len(tasks) > 1:
+                        print(f"竞速获取成功, 使用 {url}")
+                    return url, response
+        finally:
+            for task in tasks:
+                task.cancel()
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, Response) and not result.is_closed:
+                    await result.aclose()
+        if last_response is not None:
+            return last_response
+        raise last_exception or Exception("All URLs failed")
+
+    @classmethod
+    async def _race_order(
+        cls, urls: list[str], *, race_delay: float | None = 0.5, **kwargs
+    ) -> list[str]:
+        """以 HEAD 请求竞速各镜像，将最先成功响应的地址排到最前
+
+        只有一个地址、race_delay 为 None 或全部失败时保持原顺序
+        """
+        if race_delay is None or len(urls) < 2:
+            return urls
+        try:
+            url, response = await cls._race_first_successful(
+                urls, race_delay=race_delay, method="HEAD", **kwargs
+            )
+        except Exception:
+            return urls
+        if response.is_error:
+            return urls
+        return [url, *(u for u in urls if u != url)]
+
     @classmethod
     async def _get_single(
         cls,
         url: str,
         *,
+        method: str = "GET",
         params: dict[str, Any] | None = None,
         headers: dict[str, str] | None = None,
         cookies: dict[str, str] | None = None,
@@ -79,17 +478,27 @@ class AsyncHttpx:
         use_proxy: bool = True,
         proxy: dict[str, str] | None = None,
         timeout: int = 30,
+        connect_timeout: float | None = None,
+        http2: bool = False,
+        follow_redirects: bool = False,
+        stream: bool = False,
         **kwargs,
     ) -> Response:
-        async with httpx.AsyncClient(verify=verify) as client:  # type: ignore
-            return await client.get(
-                url,
-                params=params,
-                headers=headers,
-                cookies=cookies,
-                timeout=timeout,
-                **kwargs,
-            )
+        client = cls.get_client(
+            verify=verify, proxy=proxy if use_proxy else None, http2=http2
+        )
+        request = client.build_request(
+            method,
+            url,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            timeout=cls._timeout(timeout, connect_timeout),
+            **kwargs,
+        )
+        return await client.send(
+            request, stream=stream, follow_redirects=follow_redirects
+        )
 
     @classmethod
     async def head(
@@ -103,9 +512,11 @@ class AsyncHttpx:
         use_proxy: bool = True,
         proxy: dict[str, str] | None = None,
         timeout: int = 30,
+        connect_timeout: float | None = None,
+        http2: bool = False,
         **kwargs,
     ) -> Response:
-        """Get
+        """Head
 
         参数:
             url: url
@@ -116,16 +527,308 @@ class AsyncHttpx:
             use_proxy: 使用默认代理
             proxy: 指定代理
             timeout: 超时时间
+            connect_timeout: 连接超时时间，默认为 AsyncHttpx.connect_timeout
+            http2: 是否启用 http2
+        """
+        client = cls.get_client(
+            verify=verify, proxy=proxy if use_proxy else None, http2=http2
+        )
+        return await client.head(
+            url,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            timeout=cls._timeout(timeout, connect_timeout),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _progress(name: str) -> rich.progress.Progress:
+        return rich.progress.Progress(  # type: ignore
+            rich.progress.TextColumn(name),  # type: ignore
+            "[progress.percentage]{task.percentage:>3.0f}%",  # type: ignore
+            rich.progress.BarColumn(bar_width=None),  # type: ignore
+            rich.progress.DownloadColumn(),  # type: ignore
+            rich.progress.TransferSpeedColumn(),  # type: ignore
+        )
+
+    @classmethod
+    async def _download_stream(
+        cls,
+        client: httpx.AsyncClient,
+        url: str,
+        part_path: Path,
+        state: DownloadState,
+        *,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ):
+        """单连接流式下载，存在可用的续传状态时从已下载位置继续"""
+        offset = state.prefix_size() if state.validator else 0
+        if offset and offset == state.size and part_path.exists():
+            # 上次已下载完整但未完成重命名
+            return
+        # 按原始字节写入，保证与 Content-Length 及续传偏移一致
+        headers = {**(headers or {}), "Accept-Encoding": "identity"}
+        if offset and part_path.exists():
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = state.validator  # type: ignore
+        else:
+            offset = 0
+        begin_time = time.time()
+        async with client.stream(
+            "GET", url, headers=headers, follow_redirects=True, **kwargs
+        ) as response:
+            response.raise_for_status()
+            # 服务器忽略 identity 时只能写入解码后的内容，无法得知解码后的大小
+            encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+            if response.status_code != 206 or encoded:
+                offset = 0
+            length = 0 if encoded else int(response.headers.get("Content-Length", 0))
+            if not offset:
+                state.reset(
+                    url=url,
+                    size=length or None,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+                part_path.write_bytes(b"")
+            print(
+                f"{'继续' if offset else '开始'}下载 {part_path.name}.. "
+                f"Url: {url}.. Path: {part_path.absolute()}"
+            )
+            with (
+                open(part_path, "r+b") as wf,  # noqa: ASYNC230
+                cls._progress(part_path.name) as progress,
+            ):
+                wf.seek(offset)
+                begin = offset
+                download_task = progress.add_task(
+                    "Download",
+                    total=state.size or None,
+                    completed=offset,
+                )
+                try:
+                    chunks = response.aiter_bytes() if encoded else response.aiter_raw()
+                    async for chunk in chunks:
+                        wf.write(chunk)
+                        state.add_range(offset, offset + len(chunk))
+                        offset += len(chunk)
+                        progress.update(download_task, completed=offset)
+                        state.save_throttled(wf)
+                finally:
+                    state.save(wf)
+        MirrorScoreboard.record_throughput(
+            url, offset - begin, time.time() - begin_time
+        )
+
+    @classmethod
+    async def _probe_range_support(
+        cls,
+        client: httpx.AsyncClient,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | httpx.Timeout = 30,
+        **kwargs,
+    ) -> tuple[int, str | None, str | None] | None:
+        """检测地址是否支持分段下载
+
+        返回:
+            tuple[int, str | None, str | None] | None:
+                (文件大小, ETag, Last-Modified)，不支持时为 None
+        """
+        response = await client.head(
+            url,
+            headers={**(headers or {}), "Accept-Encoding": "identity"},
+            timeout=timeout,
+            follow_redirects=True,
+            **kwargs,
+        )
+        if (
+            response.status_code != 200
+            or response.headers.get("Accept-Ranges", "").lower() != "bytes"
+            or response.headers.get("Content-Encoding", "identity") != "identity"
+        ):
+            return None
+        size = int(response.headers.get("Content-Length", 0))
+        if not size:
+            return None
+        return size, response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    @classmethod
+    def _split_segments(
+        cls, gaps: list[tuple[int, int]], concurrency: int
+    ) -> list[tuple[int, int]]:
+        """将未完成的区间切分为至多 concurrency 个分段"""
+        segments = list(gaps)
+        while len(segments) < concurrency:
+            start, end = max(segments, key=lambda s: s[1] - s[0])
+            if end - start < 2 * cls.min_segment_size:
+                break
+            segments.remove((start, end))
+            middle = (start + end) // 2
+            segments.extend([(start, middle), (middle, end)])
+        return sorted(segments)
+
+    @classmethod
+    async def _download_ranges(
+        cls,
+        client: httpx.AsyncClient,
+        urls: list[str],
+        part_path: Path,
+        state: DownloadState,
+        *,
+        concurrency: int,
+        headers: dict[str, str] | None = None,
+        timeout: float | httpx.Timeout = 30,
+        **kwargs,
+    ) -> bool:
+        """多连接分段下载，各分段可分摊到返回相同文件的多个镜像
+
+        参数:
+            client: client
+            urls: 镜像地址，第一个为主地址
+            part_path: 临时文件路径
+            state: 续传状态
+            concurrency: 最大分段数
+            headers: 请求头
+            timeout: 超时时间
+
+        返回:
+            bool: 地址不支持分段下载时返回 False，由调用方回退到单连接下载
         """
-        async with httpx.AsyncClient(verify=verify) as client:  # type: ignore
-            return await client.head(
-                url,
-                params=params,
-                headers=headers,
-                cookies=cookies,
-                timeout=timeout,
-                **kwargs,
+        probes = await asyncio.gather(
+            *(
+                cls._probe_range_support(
+                    client, u, headers=headers, timeout=timeout, **kwargs
+                )
+                for u in urls
+            ),
+            return_exceptions=True,
+        )
+        primary = probes[0]
+        if not isinstance(primary, tuple):
+            return False
+        size, etag, last_modified = primary
+        if size < 2 * cls.min_segment_size and not state.ranges:
+            return False
+        mirrors = [
+            u
+            for u, probe in zip(urls, probes)
+            if isinstance(probe, tuple)
+            and probe[0] == size
+            and (not etag or not probe[1] or probe[1] == etag)
+        ]
+        if not (
+            part_path.exists()
+            and state.size == size
+            and state.validator
+            and state.validator in (etag, last_modified)
+        ):
+            state.reset(url=urls[0], size=size, etag=etag, last_modified=last_modified)
+            with open(part_path, "wb") as wf:  # noqa: ASYNC230
+                wf.truncate(size)
+        if not (gaps := state.missing()):
+            # 上次已下载完整但未完成重命名，直接交由调用方校验
+            return True
+        segments = cls._split_segments(gaps, concurrency)
+        print(
+            f"{'继续' if state.ranges else '开始'}分段下载 {part_path.name}.. "
+            f"分段数: {len(segments)}.. 镜像数: {len(mirrors)}.. "
+            f"Path: {part_path.absolute()}"
+        )
+
+        with cls._progress(part_path.name) as progress:
+            download_task = progress.add_task(
+                "Download", total=size, completed=state.completed_size()
             )
+            # 各分段正在写入的文件句柄，保存状态前需全部落盘
+            open_files: set[BufferedIOBase] = set()
+
+            async def fetch_segment(index: int, start: int, end: int):
+                last_exception: Exception | None = None
+                for attempt in range(len(mirrors)):
+                    mirror = mirrors[(index + attempt) % len(mirrors)]
+                    begin, begin_time = start, time.time()
+                    try:
+                        async with client.stream(
+                            "GET",
+                            mirror,
+                            headers={
+                                **(headers or {}),
+                                "Range": f"bytes={start}-{end - 1}",
+                                "Accept-Encoding": "identity",
+                            },
+                            timeout=timeout,
+                            follow_redirects=True,
+                            **kwargs,
+                        ) as response:
+                            response.raise_for_status()
+                            if response.status_code != 206:
+                                raise HTTPStatusError(
+                                    f"镜像不支持分段下载: {mirror}",
+                                    request=response.request,
+                                    response=response,
+                                )
+                            with open(part_path, "r+b") as wf:  # noqa: ASYNC230
+                                wf.seek(start)
+                                open_files.add(wf)
+                                try:
+                                    async for chunk in response.aiter_raw():
+                                        chunk = chunk[: end - start]
+                                        wf.write(chunk)
+                                        state.add_range(start, start + len(chunk))
+                                        start += len(chunk)
+                                        progress.update(
+                                            download_task, advance=len(chunk)
+                                        )
+                                        state.save_throttled(*open_files)
+                                finally:
+                                    state.save(*open_files)
+                                    open_files.discard(wf)
+                        MirrorScoreboard.record_throughput(
+                            mirror, start - begin, time.time() - begin_time
+                        )
+                        if start >= end:
+                            return
+                    except (TimeoutError, httpx.HTTPError) as e:
+                        last_exception = e
+                        MirrorScoreboard.record_failure(mirror)
+                raise last_exception or httpx.ReadError(
+                    f"分段下载不完整: {part_path.name}"
+                )
+
+            tasks = [
+                asyncio.create_task(fetch_segment(index, start, end))
+                for index, (start, end) in enumerate(segments)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        return True
+
+    @staticmethod
+    def _verify_file(path: Path, size: int | None, sha256: str | None) -> bool:
+        """校验文件大小与 sha256"""
+        if size is not None and path.stat().st_size != size:
+            print(f"文件大小校验失败.. 期望: {size}.. 实际: {path.stat().st_size}")
+            return False
+        if sha256:
+            digest = hashlib.sha256()
+            with open(path, "rb") as rf:
+                for block in iter(lambda: rf.read(1024 * 1024), b""):
+                    digest.update(block)
+            if digest.hexdigest().lower() != sha256.lower():
+                print(
+                    f"文件sha256校验失败.. 期望: {sha256}.. 实际: {digest.hexdigest()}"
+                )
+                return False
+        return True
 
     @classmethod
     async def download_file(
@@ -142,12 +845,16 @@ class AsyncHttpx:
         timeout: int = 30,
         stream: bool = False,
         follow_redirects: bool = True,
+        http2: bool = False,
+        concurrency: int = 1,
+        sha256: str | None = None,
+        race_delay: float | None = 0.5,
         **kwargs,
     ) -> bool:
         """下载文件
 
         参数:
-            url: url
+            url: url，为列表时先竞速选出响应最快的镜像，其余依次作为备用
             path: 存储路径
             params: params
             verify: verify
@@ -156,16 +863,34 @@ class AsyncHttpx:
             headers: 请求头
             cookies: cookies
             timeout: 超时时间
-            stream: 是否使用流式下载（流式写入+进度条，适用于下载大文件）
+            stream: 是否使用流式下载（流式写入+进度条+断点续传，适用于下载大文件）
+            http2: 是否启用 http2
+            concurrency: 流式下载时的最大分段数，大于1且服务器支持Range时多连接分段下载
+            sha256: 下载完成后校验的 sha256
+            race_delay: 多个url时竞速的错开间隔(秒)，为 None 时按顺序尝试
         """
         if isinstance(path, str):
             path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
+        urls = [url] if isinstance(url, str) else url
+        urls = await cls._race_order(
+            urls,
+            race_delay=race_delay,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            verify=verify,
+            use_proxy=use_proxy,
+            proxy=proxy,
+            timeout=timeout,
+            http2=http2,
+            follow_redirects=True,
+        )
+        part_path = path.with_name(f"{path.name}.part")
+        state = DownloadState.load(path.with_name(f"{path.name}.part.json"))
         try:
             for _ in range(3):
-                if not isinstance(url, list):
-                    url = [url]
-                for u in url:
+                for u in urls:
                     try:
                         if not stream:
                             response = await cls.get(
@@ -173,71 +898,320 @@ class AsyncHttpx:
                                 params=params,
                                 headers=headers,
                                 cookies=cookies,
+                                verify=verify,
                                 use_proxy=use_proxy,
                                 proxy=proxy,
                                 timeout=timeout,
                                 follow_redirects=follow_redirects,
+                                http2=http2,
                                 **kwargs,
                             )
                             response.raise_for_status()
-                            content = response.content
-                            with open(path, "wb") as wf:  # noqa: ASYNC230
-                                wf.write(content)
-                                print(f"下载 {u} 成功.. Path：{path.absolute()}")
+                            state.reset(url=u)
+                            part_path.write_bytes(response.content)
                         else:
-                            async with httpx.AsyncClient(verify=verify) as client:
-                                async with client.stream(
-                                    "GET",
+                            client = cls.get_client(
+                                verify=verify,
+                                proxy=proxy if use_proxy else None,
+                                http2=http2,
+                            )
+                            request_kwargs = {
+                                "params": params,
+                                "cookies": cookies,
+                                "timeout": cls._timeout(timeout, None),
+                                **kwargs,
+                            }
+                            mirrors = [u, *(m for m in urls if m != u)]
+                            if concurrency <= 1 or not await cls._download_ranges(
+                                client,
+                                mirrors,
+                                part_path,
+                                state,
+                                concurrency=concurrency,
+                                headers=headers,
+                                **request_kwargs,
+                            ):
+                                await cls._download_stream(
+                                    client,
                                     u,
-                                    params=params,
+                                    part_path,
+                                    state,
                                     headers=headers,
-                                    cookies=cookies,
-                                    timeout=timeout,
-                                    follow_redirects=True,
-                                    **kwargs,
-                                ) as response:
-                                    response.raise_for_status()
-                                    print(
-                                        f"开始下载 {path.name}.. "
-                                        f"Url: {u}.. "
-                                        f"Path: {path.absolute()}"
-                                    )
-                                    with open(path, "wb") as wf:  # noqa: ASYNC230
-                                        total = int(
-                                            response.headers.get("Content-Length", 0)
-                                        )
-                                        with rich.progress.Progress(  # type: ignore
-                                            rich.progress.TextColumn(path.name),  # type: ignore
-                                            "[progress.percentage]{task.percentage:>3.0f}%",  # type: ignore
-                                            rich.progress.BarColumn(bar_width=None),  # type: ignore
-                                            rich.progress.DownloadColumn(),  # type: ignore
-                                            rich.progress.TransferSpeedColumn(),  # type: ignore
-                                        ) as progress:
-                                            download_task = progress.add_task(
-                                                "Download",
-                                                total=total or None,
-                                            )
-                                            async for chunk in response.aiter_bytes():
-                                                wf.write(chunk)
-                                                wf.flush()
-                                                progress.update(
-                                                    download_task,
-                                                    completed=response.num_bytes_downloaded,
-                                                )
-                                        print(
-                                            f"下载 {u} 成功.. Path：{path.absolute()}"
-                                        )
+                                    **request_kwargs,
+                                )
+                        if not cls._verify_file(part_path, state.size, sha256):
+                            state.discard(part_path)
+                            print(f"下载 {u} 校验失败.. 尝试下一个地址..")
+                            continue
+                        part_path.replace(path)
+                        state.discard()
+                        print(f"下载 {u} 成功.. Path：{path.absolute()}")
                         return True
-                    except (TimeoutError, ConnectTimeout, HTTPStatusError):
+                    except (TimeoutError, httpx.HTTPError):
+                        MirrorScoreboard.record_failure(u)
                         print(f"下载 {u} 失败.. 尝试下一个地址..")
             print(f"下载 {url} 下载超时.. Path：{path.absolute()}")
         except Exception:
             print(f"下载 {url} 错误 Path：{path.absolute()}")
+        finally:
+            MirrorScoreboard.save()
         return False
 
+    @staticmethod
+    def _batch_progress() -> rich.progress.Progress:
+        return rich.progress.Progress(  # type: ignore
+            rich.progress.TextColumn("[bold yellow]{task.description}"),  # type: ignore
+            rich.progress.BarColumn(),  # type: ignore
+            "[progress.percentage]{task.percentage:>3.0f}%",  # type: ignore
+            "•",  # type: ignore
+            rich.progress.DownloadColumn(),  # type: ignore
+            "•",  # type: ignore
+            rich.progress.TransferSpeedColumn(),  # type: ignore
+            "•",  # type: ignore
+            rich.progress.TimeRemainingColumn(),  # type: ignore
+        )
+
     @classmethod
-    async def get_fastest_mirror(cls, url_list: list[str]) -> list[str]:
+    async def _fetch_task(
+        cls,
+        client: httpx.AsyncClient,
+        task: DownloadTask,
+        progress: rich.progress.Progress,
+        overall: rich.progress.TaskID,
+        *,
+        timeout: httpx.Timeout,
+    ) -> bool:
+        """流式下载单个任务，先写入 .part 文件，完成后替换，取消时删除"""
+        urls = [task.url] if isinstance(task.url, str) else task.url
+        name = task.show_name or task.save_path.name
+        task_id = progress.add_task(name, total=None)
+        part_path = task.save_path.with_name(f"{task.save_path.name}.part")
+        task.save_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            for url in urls:
+                received = length = 0
+                try:
+                    async with client.stream(
+                        "GET", url, follow_redirects=True, timeout=timeout
+                    ) as response:
+                        response.raise_for_status()
+                        # 缺少 Content-Length 时进度条不显示总量
+                        if length := int(response.headers.get("Content-Length", 0)):
+                            progress.update(task_id, total=length)
+                            total = progress.tasks[overall].total or 0
+                            progress.update(overall, total=total + length)
+                        with part_path.open("wb") as f:
+                            # 按传输字节计算进度，与 Content-Length 一致
+                            async for chunk in response.aiter_bytes():
+                                f.write(chunk)
+                                downloaded = response.num_bytes_downloaded
+                                progress.update(task_id, completed=downloaded)
+                                progress.advance(overall, downloaded - received)
+                                received = downloaded
+                    part_path.replace(task.save_path)
+                    return True
+                except (TimeoutError, httpx.HTTPError):
+                    MirrorScoreboard.record_failure(url)
+                    progress.advance(overall, -received)
+                    if length:
+                        total = progress.tasks[overall].total or 0
+                        progress.update(overall, total=total - length)
+                    progress.reset(task_id, total=None)
+                    print(f"下载 {name} 失败.. Url: {url}.. 尝试下一个地址..")
+            return False
+        finally:
+            part_path.unlink(missing_ok=True)
+            progress.remove_task(task_id)
+
+    @classmethod
+    async def download_files(
+        cls,
+        tasks: list[DownloadTask],
+        *,
+        concurrency: int = 4,
+        verify: bool = True,
+        use_proxy: bool = True,
+        proxy: dict[str, str] | None = None,
+        timeout: int = 30,
+        http2: bool = False,
+    ) -> list[bool]:
+        """同时下载多个文件，共用连接池与一个汇总进度条
+
+        进度条只显示总计与正在下载的文件；取消或某个下载出错时所有未完成的下载
+        一同取消，并删除未下载完的文件
+
+        参数:
+            tasks: 下载任务
+            concurrency: 同时下载的文件数
+            verify: verify
+            use_proxy: 使用代理
+            proxy: 指定代理
+            timeout: 超时时间
+            http2: 是否启用 http2
+
+        返回:
+            list[bool]: 各任务是否下载成功
+        """
+        client = cls.get_client(
+            verify=verify, proxy=proxy if use_proxy else None, http2=http2
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+        finished = 0
+        with cls._batch_progress() as progress:
+            overall = progress.add_task(f"总计 0/{len(tasks)}", total=None)
+
+            async def run(task: DownloadTask) -> bool:
+                nonlocal finished
+                async with semaphore:
+                    result = await cls._fetch_task(
+                        client,
+                        task,
+                        progress,
+                        overall,
+                        timeout=cls._timeout(timeout, None),
+                    )
+                finished += 1
+                progress.update(overall, description=f"总计 {finished}/{len(tasks)}")
+                return result
+
+            running = [asyncio.create_task(run(task)) for task in tasks]
+            try:
+                return list(await asyncio.gather(*running))
+            finally:
+                # 某个任务出错时 gather 直接返回，其余下载需在关闭进度条前取消
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                MirrorScoreboard.save()
+
+    @staticmethod
+    def _extract_tar_stream(
+        fileobj: "ChunkQueueReader", target: Path, strip_components: int
+    ):
+        """从流中逐个解压 tar.gz 成员，在线程中运行"""
+        extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:  # type: ignore
+            for member in tar:
+                parts = PurePosixPath(member.name).parts[strip_components:]
+                if not parts or ".." in parts or member.name.startswith("/"):
+                    continue
+                member.name = "/".join(parts)
+                if member.islnk():
+                    link_parts = PurePosixPath(member.linkname).parts
+                    member.linkname = "/".join(link_parts[strip_components:])
+                tar.extract(member, target, **extract_kwargs)  # type: ignore
+
+    @classmethod
+    async def download_extract_tar(
+        cls,
+        url: str | list[str],
+        target: str | Path,
+        *,
+        strip_components: int = 1,
+        verify: bool = True,
+        use_proxy: bool = True,
+        proxy: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: int = 30,
+        http2: bool = False,
+        race_delay: float | None = 0.5,
+    ) -> bool:
+        """边下载边解压 tar.gz 文件，不落地临时压缩包
+
+        参数:
+            url: url，为列表时先竞速选出响应最快的镜像，其余依次作为备用
+            target: 解压目标文件夹，解压完成前写入同级的临时文件夹
+            strip_components: 去除的前导路径层数
+            verify: verify
+            use_proxy: 使用代理
+            proxy: 指定代理
+            headers: 请求头
+            timeout: 超时时间
+            http2: 是否启用 http2
+            race_delay: 多个url时竞速的错开间隔(秒)，为 None 时按顺序尝试
+        """
+        if isinstance(target, str):
+            target = Path(target)
+        urls = await cls._race_order(
+            [url] if isinstance(url, str) else url,
+            race_delay=race_delay,
+            headers=headers,
+            verify=verify,
+            use_proxy=use_proxy,
+            proxy=proxy,
+            timeout=timeout,
+            http2=http2,
+            follow_redirects=True,
+        )
+        staging = target.with_name(f".{target.name}.extracting")
+        client = cls.get_client(
+            verify=verify, proxy=proxy if use_proxy else None, http2=http2
+        )
+        for u in urls:
+            if staging.exists():
+                shutil.rmtree(staging)
+            staging.mkdir(parents=True)
+            reader = ChunkQueueReader()
+            extract_task = asyncio.create_task(
+                asyncio.to_thread(
+                    cls._extract_tar_stream, reader, staging, strip_components
+                )
+            )
+            try:
+                begin_time = time.time()
+                async with client.stream(
+                    "GET",
+                    u,
+                    headers=headers,
+                    timeout=cls._timeout(timeout, None),
+                    follow_redirects=True,
+                ) as response:
+                    response.raise_for_status()
+                    print(f"开始下载并解压.. Url: {u}.. Path: {target.absolute()}")
+                    total = int(response.headers.get("Content-Length", 0))
+                    with cls._progress(target.name) as progress:
+                        download_task = progress.add_task(
+                            "Download", total=total or None
+                        )
+                        async for chunk in response.aiter_bytes():
+                            await reader.put(chunk, extract_task)
+                            progress.update(
+                                download_task, completed=response.num_bytes_downloaded
+                            )
+                    await reader.put(None, extract_task)
+                    await extract_task
+                MirrorScoreboard.record_throughput(
+                    u, response.num_bytes_downloaded, time.time() - begin_time
+                )
+                if target.exists():
+                    shutil.rmtree(target)
+                staging.rename(target)
+                print(f"下载并解压 {u} 成功.. Path：{target.absolute()}")
+                return True
+            except (TimeoutError, httpx.HTTPError, tarfile.TarError, OSError) as e:
+                MirrorScoreboard.record_failure(u)
+                print(f"下载并解压 {u} 失败.. 错误: {e!r}.. 尝试下一个地址..")
+            finally:
+                reader.abort()
+                await asyncio.gather(extract_task, return_exceptions=True)
+                MirrorScoreboard.save()
+        if staging.exists():
+            shutil.rmtree(staging)
+        return False
+
+    @classmethod
+    async def get_fastest_mirror(
+        cls, url_list: list[str], *, refresh: bool = False
+    ) -> list[str]:
+        """按镜像评分排序，评分缺失或过期时重新探测
+
+        参数:
+            url_list: 镜像地址
+            refresh: 忽略缓存的评分强制探测
+        """
         assert url_list
+        if not refresh and (ranked := MirrorScoreboard.rank(url_list)):
+            return ranked
 
         async def head_mirror(client: type[AsyncHttpx], url: str) -> dict[str, Any]:
             begin_time = time.time()
@@ -258,12 +1232,12 @@ class AsyncHttpx:
             *(head_mirror(cls, url) for url in url_list),
             return_exceptions=True,
         )
-        _results: list[dict[str, Any]] = []
-        for result in results:
+        for url, result in zip(url_list, results):
             if isinstance(result, BaseException):
                 print(f"获取镜像失败，错误：{result}")
+                MirrorScoreboard.record_failure(url, probe=True)
             else:
                 print(f"获取镜像成功，结果：{result}")
-                _results.append(result)
-        _results = sorted(iter(_results), key=lambda r: r["elapsed_time"])
-        return [result["url"] for result in _results]
+                MirrorScoreboard.record_latency(url, result["elapsed_time"])
+        MirrorScoreboard.save()
+        return MirrorScoreboard.rank(url_list) or []
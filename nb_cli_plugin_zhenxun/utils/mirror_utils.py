@@ -0,0 +1,136 @@
+import json
+import os
+import time
+
+import httpx
+
+from .const import MIRROR_SCORE_FILE
+
+
+class MirrorScoreboard:
+    """镜像评分板
+
+    按镜像地址的 host(含端口) 持久化记录延迟与吞吐量的 EWMA 以及失败次数，
+    评分在 TTL 内有效，失败次数随时间衰减。
+    """
+
+    ttl: float = 3600
+    """评分有效期(秒)，过期后需要重新探测"""
+    alpha: float = 0.3
+    """EWMA 平滑系数"""
+    failure_penalty: float = 3000
+    """每次失败折算的延迟惩罚(毫秒)"""
+    reference_size: int = 1024 * 1024
+    """按吞吐量折算传输耗时所用的参考大小(字节)"""
+
+    _scores: dict[str, dict[str, float]] | None = None
+
+    @staticmethod
+    def host(url: str) -> str:
+        """镜像键，取地址的 host(含端口)"""
+        return httpx.URL(url).netloc.decode()
+
+    @classmethod
+    def _load(cls) -> dict[str, dict[str, float]]:
+        if cls._scores is None:
+            try:
+                cls._scores = json.loads(MIRROR_SCORE_FILE.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                cls._scores = {}
+        return cls._scores  # type: ignore
+
+    @classmethod
+    def save(cls):
+        """写入评分缓存文件，先写临时文件再替换，避免并发进程读到写了一半的文件"""
+        if cls._scores is None:
+            return
+        try:
+            MIRROR_SCORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = MIRROR_SCORE_FILE.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(cls._scores), encoding="utf-8")
+            tmp_path.replace(MIRROR_SCORE_FILE)
+        except OSError as e:
+            print(f"保存镜像评分失败，错误：{e}")
+
+    @classmethod
+    def _entry(cls, url: str) -> dict[str, float]:
+        entry = cls._load().setdefault(cls.host(url), {})
+        now = time.time()
+        if failures := entry.get("failures"):
+            # 失败次数每经过一个 ttl 衰减一半
+            elapsed = now - entry.get("updated_at", now)
+            entry["failures"] = failures * 0.5 ** (elapsed / cls.ttl)
+        entry["updated_at"] = now
+        return entry
+
+    @classmethod
+    def _ewma(cls, entry: dict[str, float], key: str, value: float):
+        entry[key] = (
+            value
+            if key not in entry
+            else cls.alpha * value + (1 - cls.alpha) * entry[key]
+        )
+
+    @classmethod
+    def record_latency(cls, url: str, elapsed_time: float):
+        """记录一次成功探测的延迟(毫秒)"""
+        entry = cls._entry(url)
+        cls._ewma(entry, "latency", elapsed_time)
+        entry["alive"] = 1
+        entry["probed_at"] = entry["updated_at"]
+
+    @classmethod
+    def record_throughput(cls, url: str, size: int, elapsed: float):
+        """记录一次真实下载的吞吐量
+
+        参数:
+            url: 下载地址
+            size: 下载字节数
+            elapsed: 耗时(秒)
+        """
+        if size <= 0 or elapsed <= 0:
+            return
+        entry = cls._entry(url)
+        cls._ewma(entry, "throughput", size / elapsed)
+        entry["alive"] = 1
+
+    @classmethod
+    def record_failure(cls, url: str, *, probe: bool = False):
+        """记录一次失败
+
+        参数:
+            url: 地址
+            probe: 是否为探测失败，探测失败时在有效期内视为不可用
+        """
+        entry = cls._entry(url)
+        entry["failures"] = entry.get("failures", 0) + 1
+        if probe:
+            entry["alive"] = 0
+            entry["probed_at"] = entry["updated_at"]
+
+    @classmethod
+    def score(cls, url: str) -> float:
+        """评分，越小越好"""
+        entry = cls._load().get(cls.host(url), {})
+        score = entry.get("latency", cls.failure_penalty)
+        if throughput := entry.get("throughput"):
+            score += cls.reference_size / throughput * 1000
+        return score + entry.get("failures", 0) * cls.failure_penalty
+
+    @classmethod
+    def rank(cls, url_list: list[str]) -> list[str] | None:
+        """使用缓存的评分排序镜像
+
+        返回:
+            list[str] | None: 按评分排序的可用镜像，存在评分过期的镜像时返回 None
+        """
+        scores = cls._load()
+        now = time.time()
+        alive: list[str] = []
+        for url in url_list:
+            entry = scores.get(cls.host(url))
+            if not entry or now - entry.get("probed_at", 0) > cls.ttl:
+                return None
+            if entry.get("alive"):
+                alive.append(url)
+        return sorted(alive, key=cls.score) or None
@@ -0,0 +1,196 @@
+import errno
+import os
+from pathlib import Path
+import shutil
+import stat
+import tempfile
+import time
+from typing import Literal
+
+from .const import SOURCE_CACHE_PATH
+
+LinkMode = Literal["auto", "hardlink", "copy"]
+"""源码复制方式: auto 优先写时复制(reflink)，hardlink 硬链接，copy 普通复制"""
+
+FICLONE = 0x40049409
+"""Linux 写时复制克隆文件的 ioctl 请求码"""
+
+SOURCE_CACHE_KEEP = 3
+"""保留的源码缓存个数"""
+
+SOURCE_CACHE_GRACE = 600
+"""最近该秒数内使用过的源码缓存不清理，避免删除其他进程正在复制的缓存"""
+
+
+def remove_project(project_path: Path):
+    """删除项目文件夹，包括只读文件(如 git 对象)
+
+    参数:
+        project_path: 项目路径
+    """
+
+    def delete(func, path_, execinfo):
+        os.chmod(path_, stat.S_IWUSR)
+        func(path_)
+
+    shutil.rmtree(project_path.absolute(), onerror=delete)
+
+
+def _reflink(src: str, dst: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def link_tree(src: Path, dst: Path, mode: LinkMode = "auto"):
+    """复制目录，文件系统支持时使用 reflink 或硬链接，几乎不占额外空间
+
+    硬链接的文件与源目录共享内容，原地修改会影响所有链接，只建议用于只读源码；
+    .env 等配置文件会在创建项目时修改，始终直接复制
+
+    参数:
+        src: 源目录
+        dst: 目标目录，不能已存在
+        mode: 复制方式
+    """
+    supported = mode != "copy"
+
+    def copy_file(src_file: str, dst_file: str):
+        nonlocal supported
+        if supported and not Path(src_file).name.startswith(".env"):
+            try:
+                if mode == "hardlink":
+                    os.link(src_file, dst_file)
+                    return
+                if _reflink(src_file, dst_file):
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+            # 文件系统不支持时后续文件直接复制
+            supported = False
+        shutil.copy2(src_file, dst_file)
+
+    shutil.copytree(src, dst, symlinks=True, copy_function=copy_file)
+
+
+def reflink_supported(src_dir: Path, dst_dir: Path) -> bool:
+    """检测能否以 reflink 方式将 src_dir 中的文件复制到 dst_dir
+
+    参数:
+        src_dir: 源目录
+        dst_dir: 目标目录
+
+    返回:
+        bool: 是否支持
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=src_dir, prefix=".reflink-", delete=False
+    ) as probe:
+        probe.write(b"0")
+    target = dst_dir / Path(probe.name).name
+    try:
+        return _reflink(probe.name, str(target))
+    except OSError:
+        return False
+    finally:
+        Path(probe.name).unlink(missing_ok=True)
+        target.unlink(missing_ok=True)
+
+
+class SourceCache:
+    """源码缓存
+
+    按仓库 tree sha 保存解压后的源码，每次下载在缓存目录下独立的临时目录中进行，
+    完成后原子地重命名为缓存目录
+    """
+
+    @classmethod
+    def path(cls, key: str) -> Path:
+        return SOURCE_CACHE_PATH / key
+
+    @classmethod
+    def has(cls, key: str) -> bool:
+        return cls.path(key).is_dir()
+
+    @classmethod
+    def workdir(cls) -> Path:
+        """创建本次下载独立的临时目录，与缓存位于同一文件系统"""
+        SOURCE_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=".tmp-", dir=SOURCE_CACHE_PATH))
+
+    @classmethod
+    def store(cls, key: str, tree: Path):
+        """将下载好的源码移入缓存，已有相同缓存时保留已有的
+
+        参数:
+            key: tree sha
+            tree: 源码目录
+        """
+        try:
+            tree.rename(cls.path(key))
+        except OSError:
+            if not cls.has(key):
+                raise
+        cls.prune()
+
+    @classmethod
+    def can_share(cls, target: Path, mode: LinkMode = "auto") -> bool:
+        """从缓存复制到 target 时是否几乎不占额外空间(硬链接或 reflink)
+
+        参数:
+            target: 项目目录
+            mode: 复制方式
+        """
+        if mode == "hardlink":
+            return True
+        if mode == "copy":
+            return False
+        SOURCE_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        return reflink_supported(SOURCE_CACHE_PATH, target.absolute().parent)
+
+    @classmethod
+    def link(cls, key: str, target: Path, mode: LinkMode = "auto"):
+        """从缓存复制源码到项目目录
+
+        参数:
+            key: tree sha
+            target: 项目目录
+            mode: 复制方式
+        """
+        source = cls.path(key)
+        os.utime(source)
+        link_tree(source, target, mode)
+
+    @classmethod
+    def prune(cls, keep: int = SOURCE_CACHE_KEEP, grace: float = SOURCE_CACHE_GRACE):
+        """只保留最近使用的若干个源码缓存
+
+        参数:
+            keep: 保留个数
+            grace: 最近该秒数内使用过的缓存不清理
+        """
+        trees: list[tuple[float, Path]] = []
+        for path in SOURCE_CACHE_PATH.iterdir():
+            if path.name.startswith(".") or not path.is_dir():
+                continue
+            try:
+                trees.append((path.stat().st_mtime, path))
+            except OSError:
+                # 已被其他进程清理
+                continue
+        trees.sort(reverse=True)
+        now = time.time()
+        for mtime, path in trees[keep:]:
+            # link 开始复制前会更新缓存的修改时间
+            if now - mtime < grace:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
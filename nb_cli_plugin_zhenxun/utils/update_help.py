@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+
+import click
+
+from ..utils.github_utils import GithubUtils
+from ..utils.github_utils.models import GitHubStrategy, RepoInfo, TreeInfo, TreeType
+from ..utils.http_utils import AsyncHttpx
+
+MANIFEST_FILE_STRING = ".zhenxun_manifest.json"
+"""增量更新清单文件名"""
+
+PROTECTED_FILES = {".env", ".env.dev", ".env.prod"}
+"""默认不覆盖的用户配置文件"""
+
+
+def git_blob_sha(path: Path) -> str:
+    """计算文件的 git blob sha"""
+    content = path.read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class UpdateHelp:
+    DEFAULT_GITHUB_URL = "https://github.com/HibiKier/zhenxun_bot/tree/main"
+
+    @classmethod
+    def _load_manifest(cls, project_path: Path) -> dict:
+        try:
+            return json.loads(
+                (project_path / MANIFEST_FILE_STRING).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return {"tree_sha": None, "files": {}}
+
+    @classmethod
+    def _write_manifest(cls, project_path: Path, tree_sha: str | None, files: dict):
+        # 先写临时文件再替换，批量创建时清单可能与其他项目硬链接
+        manifest_file = project_path / MANIFEST_FILE_STRING
+        tmp_file = manifest_file.with_name(f"{manifest_file.name}.tmp")
+        tmp_file.write_text(
+            json.dumps({"tree_sha": tree_sha, "files": files}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp_file.replace(manifest_file)
+
+    @classmethod
+    def init_manifest(cls, project_path: Path, tree_info: TreeInfo):
+        """为新下载的项目写入清单，只记录与远程一致的文件
+
+        参数:
+            project_path: 项目路径
+            tree_info: 下载时的远程文件列表
+        """
+        files: dict[str, dict] = {}
+        matched = True
+        for tree in tree_info.tree:
+            if tree.type != TreeType.FILE:
+                continue
+            file = project_path / tree.path
+            if file.is_file() and git_blob_sha(file) == tree.sha:
+                files[tree.path] = cls._record(file, tree.sha)
+            else:
+                matched = False
+        # 下载期间分支有更新时不记录 tree sha，下次更新时重新比对
+        cls._write_manifest(project_path, tree_info.sha if matched else None, files)
+
+    @classmethod
+    def _local_sha(cls, file: Path, record: dict | None) -> str | None:
+        """获取本地文件 sha，大小与修改时间未变时直接使用清单中的记录"""
+        if not file.is_file():
+            return None
+        stat = file.stat()
+        if (
+            record
+            and record.get("size") == stat.st_size
+            and record.get("mtime") == stat.st_mtime_ns
+        ):
+            return record["sha"]
+        return git_blob_sha(file)
+
+    @classmethod
+    def _record(cls, file: Path, sha: str) -> dict:
+        stat = file.stat()
+        return {"sha": sha, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    @classmethod
+    async def _download_blob(
+        cls, repo_info: RepoInfo, path: str, sha: str, target: Path
+    ) -> bool:
+        """下载单个文件并校验 blob sha，校验失败时尝试下一个镜像"""
+        tmp_file = target.with_name(f"{target.name}.zxtmp")
+        for url in await repo_info.get_raw_download_urls(path):
+            if await AsyncHttpx.download_file(url, tmp_file, follow_redirects=True):
+                if git_blob_sha(tmp_file) == sha:
+                    tmp_file.replace(target)
+                    return True
+                print(f"文件 {path} 校验失败.. Url: {url}")
+        tmp_file.unlink(missing_ok=True)
+        return False
+
+    @classmethod
+    async def update(
+        cls,
+        ctx: click.Context,
+        project_path: Path,
+        *,
+        concurrency: int = 8,
+        force: bool = False,
+        refresh: bool = False,
+    ):
+        """按 git tree 增量更新项目
+
+        参数:
+            ctx: ctx
+            project_path: 项目路径
+            concurrency: 同时下载的文件数
+            force: 覆盖本地修改过的文件与受保护的配置文件
+            refresh: 忽略本地缓存的远程文件列表
+        """
+        repo_info = GithubUtils.parse_github_url(cls.DEFAULT_GITHUB_URL)
+        click.secho("正在获取远程文件列表...", fg="yellow")
+        tree_info = await GitHubStrategy.parse_repo_info(repo_info, refresh)
+        manifest = cls._load_manifest(project_path)
+        if manifest["tree_sha"] == tree_info.sha and not force:
+            click.secho("小真寻已是最新版本！", fg="green")
+            return
+
+        old_files: dict[str, dict] = manifest["files"]
+        remote = {t.path: t.sha for t in tree_info.tree if t.type == TreeType.FILE}
+        new_files: dict[str, dict] = {}
+        changed: list[str] = []
+        skipped: list[str] = []
+        click.secho("正在比对本地文件...", fg="yellow")
+        for path, sha in remote.items():
+            file = project_path / path
+            local_sha = cls._local_sha(file, old_files.get(path))
+            if local_sha == sha:
+                new_files[path] = cls._record(file, sha)
+                continue
+            locally_modified = local_sha is not None and (
+                path in PROTECTED_FILES
+                or (path in old_files and old_files[path]["sha"] != local_sha)
+            )
+            if locally_modified and not force:
+                skipped.append(path)
+                if path in old_files:
+                    new_files[path] = old_files[path]
+                continue
+            changed.append(path)
+
+        removed = [
+            path
+            for path, record in old_files.items()
+            if path not in remote
+            and cls._local_sha(project_path / path, record) == record["sha"]
+        ]
+        click.secho(
+            f"需要更新 {len(changed)} 个文件，删除 {len(removed)} 个文件，"
+            f"跳过 {len(skipped)} 个本地修改的文件",
+            fg="yellow",
+        )
+
+        semaphore = asyncio.Semaphore(concurrency)
+        failed: list[str] = []
+
+        async def update_file(path: str):
+            async with semaphore:
+                target = project_path / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if await cls._download_blob(repo_info, path, remote[path], target):
+                    new_files[path] = cls._record(target, remote[path])
+                else:
+                    failed.append(path)
+                    if path in old_files:
+                        new_files[path] = old_files[path]
+
+        await asyncio.gather(*(update_file(path) for path in changed))
+
+        for path in removed:
+            file = project_path / path
+            file.unlink(missing_ok=True)
+            for parent in file.parents:
+                if parent == project_path or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+
+        for path in skipped:
+            click.secho(f"跳过本地修改的文件: {path}", fg="yellow")
+        if failed:
+            for path in failed:
+                click.secho(f"更新文件失败: {path}", fg="red")
+            # 保留旧的 tree sha，下次更新时重新比对
+            cls._write_manifest(project_path, manifest["tree_sha"], new_files)
+            ctx.exit(1)
+        cls._write_manifest(project_path, tree_info.sha, new_files)
+        click.secho("小真寻更新完成！", fg="green")